@@ -13,6 +13,7 @@ from app.services.database import DatabaseService
 from app.services.indexer import IndexerService
 from app.services.memory import MemoryService
 from app.services.document import DocumentService
+from app.services.sql_agent import SqlAgent
 from app.services.website import WebsiteService
 
 
@@ -67,8 +68,8 @@ def get_database() -> DatabaseService:
     """
     Provides a cached instance of the DatabaseService.
 
-    The lru_cache decorator ensures this function returns the same DatabaseService
-    instance across multiple calls, optimizing resource usage.
+    DatabaseService is itself a singleton, so services constructing it
+    directly share the same connection pool as this dependency.
 
     Returns:
         DatabaseService: A singleton instance of the DatabaseService
@@ -81,15 +82,34 @@ def get_agent() -> AgentService:
     """
     Provides a cached instance of the AgentService.
 
-    This dependency has its own dependencies (IndexerService) which are
-    automatically resolved through the get_indexer dependency.
+    This dependency has its own dependencies (IndexerService, MemoryService,
+    SqlAgent) which are automatically resolved through their dependencies.
 
     Returns:
         AgentService: A singleton instance of the AgentService
     """
     indexer = get_indexer()
     memory = get_memory()
-    return AgentService(indexer=indexer, memory=memory)
+    sql_agent = get_sql_agent()
+    return AgentService(indexer=indexer, memory=memory, sql_agent=sql_agent)
+
+
+@lru_cache
+def get_sql_agent() -> SqlAgent:
+    """
+    Provides a cached instance of the SqlAgent.
+
+    The SqlAgent's database engine, reflected schema, toolkit, tools and answer
+    cache are built once and shared. Its database connection is made by
+    SqlAgent.ainit when the agent workflow is created.
+    When the answer cache is enabled, questions are embedded with the
+    IndexerService's embedding model.
+
+    Returns:
+        SqlAgent: A singleton instance of the SqlAgent
+    """
+    indexer = get_indexer()
+    return SqlAgent(embedding_model=indexer.embedding_model)
 
 
 @lru_cache
@@ -105,4 +125,5 @@ def initialize_dependency():
     get_document()
     get_indexer()
     get_memory()
+    get_sql_agent()
     get_agent()
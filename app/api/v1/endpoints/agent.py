@@ -9,9 +9,10 @@ and receive responses, including streaming responses for real-time feedback.
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.responses import StreamingResponse
 
-from app.api.dependency import get_agent
-from app.models.agent import AgentProcessingRequest
+from app.api.dependency import get_agent, get_sql_agent
+from app.models.agent import AgentProcessingRequest, SqlBatchRequest, SqlBatchResponse
 from app.services.agent import AgentService
+from app.services.sql_agent import SqlAgent
 from app.utils.logger import logger
 
 # Agent-specific router with appropriate tags and prefix
@@ -58,3 +59,42 @@ async def stream_agent(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error streaming response: {str(e)}",
         )
+
+
+@router.post(
+    "/sql/batch",
+    summary="Answer several SQL questions at once",
+    description="Submit independent questions to be answered by the SQL agent in a single run",
+    response_model=SqlBatchResponse,
+)
+async def batch_sql_questions(
+    request: SqlBatchRequest,
+    sql_agent: SqlAgent = Depends(get_sql_agent),
+):
+    """
+    Answer several independent questions with one SQL agent run.
+
+    The questions share one prompt and any schema lookups, so a batch
+    costs far less than asking each question separately.
+
+    Args:
+        request: The questions to answer
+        sql_agent: SqlAgent dependency for answering the questions
+
+    Returns:
+        SqlBatchResponse: The answer to each question, in order
+
+    Raises:
+        HTTPException: If the agent fails or its reply cannot be parsed
+    """
+    logger.debug(f"Answering {len(request.questions)} SQL questions")
+
+    try:
+        answers = await sql_agent.abatch_ask(request.questions)
+        return SqlBatchResponse(answers=answers)
+    except Exception as e:
+        logger.error(f"Error answering SQL questions: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error answering questions: {str(e)}",
+        )
@@ -6,6 +6,8 @@ It allows clients to upload documents which are then processed and added to the
 for later retrieval and querying.
 """
 
+from typing import List
+
 from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, status
 
 from app.api.dependency import get_document
@@ -49,21 +51,65 @@ async def process_document(
     logger.debug(f"Processing file: {file.filename}")
 
     try:
-        # Read file content
-        content = await file.read()
-
-        # Process the uploaded document
+        # Process the uploaded document, streaming it to disk
         result = await document.index_document(
-            content=content,
+            upload_file=file,
             file_name=file.filename,
         )
 
         logger.info(f"Successfully processed document: {file.filename}")
         return result
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error processing document {file.filename}: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error processing document: {str(e)}",
         )
+
+
+@router.post(
+    "/batch",
+    summary="Process and index several documents",
+    description="Upload multiple document files to be processed and indexed concurrently",
+)
+async def process_documents(
+    files: List[UploadFile] = File(...),
+    document: DocumentService = Depends(get_document),
+):
+    """
+    Process and index several uploaded document files.
+
+    Documents are processed concurrently; the result for each file is
+    reported individually, so one failing file does not fail the batch.
+
+    Args:
+        files: The uploaded document files
+        document: DocumentService dependency for document indexing
+
+    Returns:
+        list: Status of the processing operation for each document
+
+    Raises:
+        HTTPException: If the batch cannot be processed
+    """
+    logger.debug(f"Processing {len(files)} files")
+
+    try:
+        results = await document.index_documents(
+            [(file, file.filename) for file in files]
+        )
+
+        logger.info(f"Processed {len(files)} documents")
+        return results
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error processing documents: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error processing documents: {str(e)}",
+        )
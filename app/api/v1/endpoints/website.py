@@ -50,7 +50,7 @@ async def process_website(
         logger.debug(f"Processing website {request.url}")
 
         # Check if website was already processed
-        if database.website_exists(str(request.url)):
+        if await database.awebsite_exists(str(request.url)):
             logger.info(f"Website {request.url} already processed, skipping")
             return {"status": "Website already processed."}
 
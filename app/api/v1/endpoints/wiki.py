@@ -64,7 +64,7 @@ async def process_wiki(
             )
 
         # Check if wiki was already processed
-        if database.wiki_exists(
+        if await database.awiki_exists(
             request.organization, request.project, request.wikiIdentifier
         ):
             logger.info(f"Wiki {request.wikiIdentifier} already processed, skipping")
@@ -10,9 +10,9 @@ Environment variables can override default values when loaded through the .env f
 
 from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Type
+from typing import Dict, Optional, Type
 
-from langchain_community.document_loaders import Docx2txtLoader, PyPDFLoader
+from langchain_community.document_loaders import Docx2txtLoader, PyPDFium2Loader
 from langchain_community.document_loaders.base import BaseLoader
 from langchain_ollama import ChatOllama
 from langchain_openai import AzureChatOpenAI
@@ -46,8 +46,9 @@ class Settings(BaseSettings):
     data_dir: Path = root_dir / "data"
 
     # Document loader configuration
+    # PDFs are parsed with pdfium, which renders and releases one page at a time
     supported_extensions: Dict[str, Type[BaseLoader]] = {
-        "pdf": PyPDFLoader,
+        "pdf": PyPDFium2Loader,
         "docx": Docx2txtLoader,
     }
 
@@ -62,9 +63,37 @@ class Settings(BaseSettings):
     azure_embedding_endpoint: str
     embedding_api_version: str
 
+    # Truncated embedding size (text-embedding-3 models only); None keeps the
+    # model's full size. Changing it requires re-indexing the vector store.
+    embedding_dimensions: Optional[int] = None
+
+    # Embedding batching: chunks per Azure request and concurrent requests
+    embedding_batch_size: int = 128
+    embedding_concurrency: int = 8
+
+    # Documents processed concurrently by a bulk upload
+    ingest_concurrency: int = 4
+
+    # Web and wiki pages fetched concurrently while crawling
+    crawl_concurrency: int = 32
+
     # Database connection string
     database: str
 
+    # Seconds the SQL agent reuses its cached reflection of the database schema
+    schema_cache_ttl: int = 900
+
+    # Milliseconds a query issued by the SQL agent may run before it is cancelled
+    sql_statement_timeout_ms: int = 15000
+
+    # SQL agent answers reused for questions at least this similar (cosine),
+    # for answer_cache_ttl seconds. Off by default: questions differing only
+    # in a month, account or service embed above the threshold, so a cached
+    # answer can carry another question's figures.
+    answer_cache_enabled: bool = False
+    answer_cache_threshold: float = 0.95
+    answer_cache_ttl: int = 900
+
     @property
     def llm(self) -> AzureChatOpenAI:
         """
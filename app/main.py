@@ -12,9 +12,17 @@ import uvicorn
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.api.dependency import get_agent, get_memory, initialize_dependency
+from app.api.dependency import (
+    get_agent,
+    get_database,
+    get_memory,
+    get_sql_agent,
+    get_website,
+    initialize_dependency,
+)
 from app.api.v1.router import router as v1_router
 from app.core.config import settings
+from app.services.wiki import WikiService
 from app.utils.logger import logger
 
 # TODO: Move these environment variables to a proper configuration management
@@ -30,12 +38,18 @@ async def lifespan(app: FastAPI):
     logger.debug("Initializing lifespan.")
     initialize_dependency()
     memory_service = get_memory()
-    await memory_service.setup_memory_table()
+    await memory_service.startup()
     agent = get_agent()
     await agent.ainit()
 
     yield
 
+    await memory_service.aclose()
+    await get_website().aclose()
+    await WikiService.aclose()
+    await get_sql_agent().aclose()
+    get_database().close()
+
 
 def create_application() -> FastAPI:
     """
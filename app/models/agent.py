@@ -9,6 +9,7 @@ in the correct format before being processed by the agent service.
 from pydantic import BaseModel, Field
 
 from typing import (
+    List,
     Literal,
     Union,
 )
@@ -36,6 +37,39 @@ class AgentProcessingRequest(BaseModel):
         }
 
 
+class SqlBatchRequest(BaseModel):
+    """
+    Model for batched SQL questions.
+
+    Represents several independent questions answered together by the SQL agent.
+    """
+
+    questions: List[str] = Field(
+        ...,
+        min_length=1,
+        max_length=20,
+        description="Independent questions to be answered in one agent run",
+    )
+
+    class Config:
+        """Pydantic configuration settings"""
+
+        json_schema_extra = {
+            "example": {
+                "questions": [
+                    "What was our total Azure spending last month?",
+                    "Which service cost the most last month?",
+                ],
+            }
+        }
+
+
+class SqlBatchResponse(BaseModel):
+    """Answers to a SqlBatchRequest, in question order."""
+
+    answers: List[str]
+
+
 class RouteResponse(BaseModel):
     """Structured output for the supervisor's routing decision."""
 
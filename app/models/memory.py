@@ -0,0 +1,23 @@
+"""
+Memory Models
+
+This module defines the row types read from the agent memory (checkpoint)
+tables. Rows are plain slotted dataclasses, which are cheaper to build and
+hold than one dict per row.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+
+@dataclass(slots=True)
+class CheckpointRow:
+    """A single checkpoint of a conversation thread."""
+
+    thread_id: str
+    checkpoint_ns: str
+    checkpoint_id: str
+    parent_checkpoint_id: Optional[str]
+    type: Optional[str]
+    checkpoint: Dict[str, Any]
+    metadata: Dict[str, Any]
@@ -17,6 +17,35 @@ from app.services.sql_agent import SqlAgent
 from app.models.agent import RouteResponse
 from app.utils.logger import logger
 
+_SUPERVISOR_PROMPT = """
+You are a supervisor tasked with managing a conversation between the following workers: {members}.
+Given the user request and conversation history, respond with the worker to act next.
+Each worker will perform a task and report back.
+If the conversation is over, respond with 'FINISH'.
+
+- **SQL_agent**: Use this worker for tasks that involve:
+  - Optimizing cloud costs.
+  - Providing recommendations on cloud usage.
+  - Analyzing cloud cost and performing calculations.
+  - Retrieving, calculating, or analyzing data from the database.
+
+- **DOCS_agent**: Use this worker for tasks that involve:
+  - Questions related to Amadis or Cloudcadi.
+  - Conceptual knowledge, explanations, or information from documents.
+
+Decision Criteria:
+- If the query is about cloud costs, usage, or requires database access, route to **SQL_agent**.
+- If the query is about Amadis, Cloudcadi, or requires document information, route to **DOCS_agent**.
+- If the query is a general greeting or doesn’t require specific agent capabilities, respond directly.
+
+Example Decision Flow:
+- Query: "How can I reduce my AWS costs?" -> **SQL_agent**
+- Query: "What is Amadis?" -> **DOCS_agent**
+- Query: "Hello" -> Respond directly
+
+Based on the conversation, who should act next? Or should we FINISH? Select one of: {options}
+"""
+
 
 class AgentService:
     """
@@ -28,6 +57,7 @@ class AgentService:
         self,
         indexer: IndexerService,
         memory: MemoryService,
+        sql_agent: SqlAgent,
     ) -> None:
         """
         Initialize the Agent Service with necessary components and set up the workflow.
@@ -35,6 +65,7 @@ class AgentService:
         Args:
             indexer (IndexerService): Service for document indexing and retrieval
             memory (MemoryService): Service for maintaining conversation context
+            sql_agent (SqlAgent): Shared SQL agent with its database connection and tools
         """
         self.llm = settings.llm
         self.indexer = indexer
@@ -42,7 +73,7 @@ class AgentService:
 
         # Create specialized agents
         self.doc_agent = RetrievalAgent(indexer=indexer)
-        self.sql_agent = SqlAgent()
+        self.sql_agent = sql_agent
 
         # Set up the LangGraph workflow
         self.graph = None
@@ -62,38 +93,8 @@ class AgentService:
         members = ["SQL_agent", "DOCS_agent"]
         options = ["FINISH"] + members
 
-        # Define the supervisor prompt
-        supervisor_prompt = """
-You are a supervisor tasked with managing a conversation between the following workers: {members}.
-Given the user request and conversation history, respond with the worker to act next.
-Each worker will perform a task and report back.
-If the conversation is over, respond with 'FINISH'.
-
-- **SQL_agent**: Use this worker for tasks that involve:
-  - Optimizing cloud costs.
-  - Providing recommendations on cloud usage.
-  - Analyzing cloud cost and performing calculations.
-  - Retrieving, calculating, or analyzing data from the database.
-
-- **DOCS_agent**: Use this worker for tasks that involve:
-  - Questions related to Amadis or Cloudcadi.
-  - Conceptual knowledge, explanations, or information from documents.
-
-Decision Criteria:
-- If the query is about cloud costs, usage, or requires database access, route to **SQL_agent**.
-- If the query is about Amadis, Cloudcadi, or requires document information, route to **DOCS_agent**.
-- If the query is a general greeting or doesn’t require specific agent capabilities, respond directly.
-
-Example Decision Flow:
-- Query: "How can I reduce my AWS costs?" -> **SQL_agent**
-- Query: "What is Amadis?" -> **DOCS_agent**
-- Query: "Hello" -> Respond directly
-
-Based on the conversation, who should act next? Or should we FINISH? Select one of: {options}
-"""
-
         prompt = ChatPromptTemplate.from_messages([
-            ("system", supervisor_prompt),
+            ("system", _SUPERVISOR_PROMPT),
             MessagesPlaceholder(variable_name="messages"),
             (
                 "system",
@@ -114,16 +115,20 @@ Based on the conversation, who should act next? Or should we FINISH? Select one
             return {"next": route_response.next}
 
         # Define agent node function
-        async def agent_node(state, agent, name):
+        async def agent_node(state, config, agent, name):
             """Invoke an agent and update the state with its response."""
             logger.debug(f"Calling agent node with agent: {name}")
-            result = await agent.ainvoke({"messages": state["messages"]})
+            # Forward the parent config so the sub-agent runs under the same
+            # thread_id and shares the supervisor graph's checkpointer.
+            result = await agent.ainvoke({"messages": state["messages"]}, config)
             # last_message = result["messages"][-1]
             # return {"messages": [AIMessage(content=last_message.content, name=name)]}
             return {"messages": result["messages"]}
 
-        doc_agent_instance = await self.doc_agent.create_retrieval_agent(self.memory)
-        sql_agent_instance = await self.sql_agent.create_sql_agent(self.memory)
+        # Sub-agents are compiled once without their own checkpointer; the
+        # supervisor graph persists state per conversation via thread_id.
+        doc_agent_instance = await self.doc_agent.create_retrieval_agent()
+        sql_agent_instance = await self.sql_agent.create_sql_agent()
 
         # Create agent nodes
         doc_node = functools.partial(
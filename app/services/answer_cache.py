@@ -0,0 +1,134 @@
+"""
+Answer Cache Module
+
+This module provides a semantic cache for agent answers. Questions are
+embedded, and a new question whose embedding is close enough to a cached
+one gets the cached answer instead of another run of the agent loop.
+
+Entries expire after a fixed time so answers over live data don't go stale,
+and the cache is held in process memory.
+"""
+
+import time
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from app.utils.logger import logger
+
+
+class SemanticAnswerCache:
+    """
+    Cache of answers keyed by the embedding of the question they answer.
+    """
+
+    def __init__(
+        self,
+        embedding_model: Embeddings,
+        threshold: float = 0.95,
+        ttl: int = 900,
+        max_entries: int = 512,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            embedding_model: Model used to embed questions
+            threshold: Minimum cosine similarity for a cached answer to be used
+            ttl: Seconds an answer is served after it was cached
+            max_entries: Maximum number of cached answers
+        """
+        self._embedding_model = embedding_model
+        self._threshold = threshold
+        self._ttl = ttl
+        self._max_entries = max_entries
+        # Unit-length question embeddings, one row per entry
+        self._vectors = np.empty((0, 0), dtype=np.float32)
+        # (time cached, answer) per row of _vectors
+        self._entries: List[Tuple[float, str]] = []
+        # Recently embedded questions, so a lookup and the following store
+        # embed the question once
+        self._recent: OrderedDict[str, np.ndarray] = OrderedDict()
+
+    async def _aembed(self, question: str) -> np.ndarray:
+        """
+        Embed a question as a unit-length vector.
+        """
+        vector = self._recent.pop(question, None)
+        if vector is None:
+            vector = np.asarray(
+                await self._embedding_model.aembed_query(question), dtype=np.float32
+            )
+            vector /= np.linalg.norm(vector) or 1.0
+        self._recent[question] = vector
+        if len(self._recent) > self._max_entries:
+            self._recent.popitem(last=False)
+        return vector
+
+    def _evict_expired(self) -> None:
+        """
+        Drop entries older than the TTL.
+        """
+        cutoff = time.monotonic() - self._ttl
+        keep = [i for i, (created, _) in enumerate(self._entries) if created > cutoff]
+        if len(keep) < len(self._entries):
+            self._vectors = self._vectors[keep]
+            self._entries = [self._entries[i] for i in keep]
+
+    async def aget(self, question: str) -> Optional[str]:
+        """
+        Look up the answer to a question similar to this one.
+
+        Args:
+            question: The user's question
+
+        Returns:
+            Optional[str]: The cached answer, or None if there is no close match
+        """
+        self._evict_expired()
+        if not self._entries:
+            return None
+
+        try:
+            vector = await self._aembed(question)
+        except Exception as e:
+            logger.warning(f"Answer cache lookup failed: {e}")
+            return None
+        # Entries may have expired while the question was embedded
+        self._evict_expired()
+        if not self._entries:
+            return None
+        similarities = self._vectors @ vector
+        best = int(np.argmax(similarities))
+        if similarities[best] < self._threshold:
+            return None
+
+        logger.debug(f"Answer cache hit (similarity {similarities[best]:.3f})")
+        return self._entries[best][1]
+
+    async def aput(self, question: str, answer: str) -> None:
+        """
+        Cache the answer to a question.
+
+        Args:
+            question: The user's question
+            answer: The agent's final answer
+        """
+        try:
+            vector = await self._aembed(question)
+        except Exception as e:
+            logger.warning(f"Failed to cache answer: {e}")
+            return
+
+        self._evict_expired()
+        if len(self._entries) >= self._max_entries:
+            self._vectors = self._vectors[1:]
+            self._entries = self._entries[1:]
+
+        if self._vectors.size:
+            self._vectors = np.vstack([self._vectors, vector])
+        else:
+            self._vectors = vector[np.newaxis, :]
+        self._entries.append((time.monotonic(), answer))
@@ -1,7 +1,7 @@
 """
 Database Service Module
 
-This module provides SQLite database services for the application.
+This module provides PostgreSQL database services for the application.
 It manages database connections, schema initialization, and CRUD operations
 for various entities (wiki, document, website).
 
@@ -10,20 +10,121 @@ about indexed content, enabling tracking of processed resources and preventing
 redundant processing.
 """
 
-import sqlite3
-from datetime import datetime
+import asyncio
+from typing import Final, Iterable, Optional, Sequence, Set, Tuple
 
-import psycopg2
+import psycopg
+from psycopg_pool import ConnectionPool
+from tenacity import (
+    retry,
+    retry_if_exception_type,
+    stop_after_attempt,
+    wait_exponential,
+)
 
 from app.core.config import settings
 from app.utils.logger import logger
 
+# Hot statements, executed with prepare=True so each pooled connection keeps
+# them prepared server-side after the first use.
+_UPSERT_WIKI_SQL: Final[str] = (
+    "INSERT INTO wiki (organization, project, wiki_identifier) VALUES (%s, %s, %s) ON CONFLICT (organization, project, wiki_identifier) DO NOTHING RETURNING 1"
+)
+_WIKI_EXISTS_SQL: Final[str] = (
+    "SELECT EXISTS (SELECT 1 FROM wiki WHERE organization = %s AND project = %s AND wiki_identifier = %s)"
+)
+_UPSERT_DOCUMENT_SQL: Final[str] = (
+    "INSERT INTO document (file_name) VALUES (%s) ON CONFLICT (file_name) DO NOTHING RETURNING 1"
+)
+_DOCUMENT_EXISTS_SQL: Final[str] = (
+    "SELECT EXISTS (SELECT 1 FROM document WHERE file_name = %s)"
+)
+_UPSERT_WEBSITE_SQL: Final[str] = (
+    "INSERT INTO website (url) VALUES (%s) ON CONFLICT (url) DO NOTHING RETURNING 1"
+)
+_WEBSITE_EXISTS_SQL: Final[str] = "SELECT EXISTS (SELECT 1 FROM website WHERE url = %s)"
+_EXISTING_WEBSITES_SQL: Final[str] = "SELECT url FROM website WHERE url = ANY(%s)"
+
+# Retry idempotent lookups on transient connection/server errors
+_retry_transient = retry(
+    retry=retry_if_exception_type(psycopg.OperationalError),
+    stop=stop_after_attempt(3),
+    wait=wait_exponential(multiplier=0.05),
+    reraise=True,
+)
+
+# Upper bound on remembered keys before the exists cache is reset
+_EXISTS_CACHE_SIZE: Final[int] = 10000
+
+# Per-row inserts sent back-to-back in pipeline mode by the batch methods
+_ADD_DOCUMENTS_SQL: Final[str] = (
+    "INSERT INTO document (file_name) VALUES (%s) ON CONFLICT (file_name) DO NOTHING"
+)
+_ADD_WEBSITES_SQL: Final[str] = (
+    "INSERT INTO website (url) VALUES (%s) ON CONFLICT (url) DO NOTHING"
+)
+
+# Large website batches are streamed with COPY into a staging table, then
+# merged skipping existing rows: (create staging table, copy, merge)
+_COPY_WEBSITES_SQL: Final = (
+    "CREATE TEMP TABLE website_staging (LIKE website INCLUDING DEFAULTS) ON COMMIT DROP",
+    "COPY website_staging (url) FROM STDIN",
+    "INSERT INTO website SELECT * FROM website_staging ON CONFLICT (url) DO NOTHING",
+)
+# Rows from which COPY beats pipelined INSERTs
+_COPY_MIN_ROWS: Final[int] = 500
+
+# Content hashes of embedded chunks, used to skip re-embedding known text
+_CHUNK_HASHES_SQL: Final[str] = "SELECT hash FROM chunk_hashes WHERE hash = ANY(%s)"
+_ADD_CHUNK_HASHES_SQL: Final[str] = (
+    "INSERT INTO chunk_hashes (hash, doc_id, chunk_id) VALUES (%s, %s, %s) ON CONFLICT (hash) DO NOTHING"
+)
+
+# True when all tables exist with the created_at default in place,
+# letting startup skip the DDL below entirely
+_SCHEMA_READY_SQL: Final[str] = (
+    "SELECT count(*) = 4 FROM information_schema.columns WHERE table_schema = current_schema() AND table_name IN ('wiki', 'document', 'website', 'chunk_hashes') AND column_name = 'created_at' AND column_default IS NOT NULL"
+)
+
+# Advisory lock key serializing schema setup across worker processes
+_SCHEMA_LOCK_KEY: Final[int] = 845112
+
+# Schema for the wiki, document, website and chunk_hashes tables, sent as one statement batch.
+# created_at is filled in by the server in UTC; the ALTERs bring tables created
+# before the default existed up to date.
+_SCHEMA_DDL: Final[str] = """
+CREATE TABLE IF NOT EXISTS wiki(
+  organization TEXT,
+  project TEXT,
+  wiki_identifier TEXT,
+  created_at TIMESTAMP NOT NULL DEFAULT (now() AT TIME ZONE 'utc'),
+  PRIMARY KEY (organization, project, wiki_identifier)
+);
+CREATE TABLE IF NOT EXISTS document(
+  file_name TEXT PRIMARY KEY,
+  created_at TIMESTAMP NOT NULL DEFAULT (now() AT TIME ZONE 'utc')
+);
+CREATE TABLE IF NOT EXISTS website(
+  url TEXT PRIMARY KEY,
+  created_at TIMESTAMP NOT NULL DEFAULT (now() AT TIME ZONE 'utc')
+);
+CREATE TABLE IF NOT EXISTS chunk_hashes(
+  hash TEXT PRIMARY KEY,
+  doc_id TEXT NOT NULL,
+  chunk_id TEXT NOT NULL,
+  created_at TIMESTAMP NOT NULL DEFAULT (now() AT TIME ZONE 'utc')
+);
+ALTER TABLE wiki ALTER COLUMN created_at SET DEFAULT (now() AT TIME ZONE 'utc');
+ALTER TABLE document ALTER COLUMN created_at SET DEFAULT (now() AT TIME ZONE 'utc');
+ALTER TABLE website ALTER COLUMN created_at SET DEFAULT (now() AT TIME ZONE 'utc');
+"""
+
 
 class DatabaseService:
     """
-    Service for managing SQLite database operations.
+    Service for managing PostgreSQL database operations.
 
-    This service initializes and manages the SQLite database used for
+    This service initializes and manages the PostgreSQL tables used for
     tracking metadata about indexed content. It provides methods for:
     - Creating and initializing database tables
     - Adding new records for processed content
@@ -33,78 +134,147 @@ class DatabaseService:
     corresponding methods for adding and checking existence.
     """
 
+    # Set once the schema has been created in this process
+    _tables_ready = False
+
+    # Shared instance so the pool and exists cache are created only once
+    _instance: Optional["DatabaseService"] = None
+
+    def __new__(cls):
+        """
+        Return the process-wide DatabaseService instance, creating it on first use.
+        """
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
     def __init__(self):
         """
         Initialize the DatabaseService.
 
-        Sets up the database path and creates required tables if they don't exist.
+        Sets up the connection pool and creates required tables if they don't exist.
+        Repeated construction returns the already initialized shared instance.
+        """
+        if getattr(self, "_initialized", False):
+            return
+
+        try:
+            # The DSN is handed to the pool once; connections are reused
+            # across calls instead of paying a new handshake every time.
+            self._pool = ConnectionPool(
+                conninfo=settings.database,
+                min_size=1,
+                max_size=20,
+                open=True,
+            )
+        except psycopg.Error as e:
+            logger.error(f"Failed to create database connection pool: {str(e)}")
+            raise
+
+        # Keys of rows known to exist. Rows are never deleted, so a hit can
+        # skip the database; misses are not cached since another worker may
+        # record the row at any time.
+        self._known: Set[tuple] = set()
+
+        # Initialize tables once per process
+        if not type(self)._tables_ready:
+            self._initialize_tables()
+            type(self)._tables_ready = True
+
+        self._initialized = True
+
+    def close(self) -> None:
         """
-        # Initialize tables on service start
-        self._initialize_tables()
+        Close the connection pool.
+
+        Called once at application shutdown; the next DatabaseService()
+        creates a fresh instance and pool.
+        """
+        self._pool.close()
+        type(self)._instance = None
+        logger.debug("Database connection pool closed")
 
     def _get_connection(self):
         """
-        Create and return a new Postgres database connection.
+        Borrow a Postgres connection from the pool.
+
+        The returned context manager commits on success, rolls back on error
+        and always returns the connection to the pool.
 
+        Returns:
+            Context manager yielding a pooled psycopg connection
         """
-        try:
-            conn = psycopg2.connect(settings.database)
-            return conn
-        except psycopg2.Error as e:
-            logger.error(f"Failed to connect to database: {str(e)}")
-            raise
+        return self._pool.connection()
+
+    @staticmethod
+    def _execute_prepared(cur: psycopg.Cursor, sql: str, params: Sequence) -> None:
+        """
+        Execute a hot statement server-side prepared, with binary results.
+
+        Args:
+            cur: Cursor of a pooled connection
+            sql: One of the module-level statement constants
+            params: Positional parameters for the statement
+        """
+        cur.execute(sql, params, prepare=True, binary=True)
+
+    def _remember(self, key: tuple) -> None:
+        """
+        Record that the row identified by key exists.
+
+        Args:
+            key: Table name followed by the row's primary key values
+        """
+        if len(self._known) >= _EXISTS_CACHE_SIZE:
+            self._known.clear()
+        self._known.add(key)
 
     def _initialize_tables(self) -> None:
         """
         Initialize database tables if they don't exist.
 
-        Creates tables for wiki, document, and website metadata.
+        Creates tables for wiki, document, website and chunk hash metadata
+        in a single round-trip, after a cheap catalog probe shows they are
+        missing or out of date. A transaction-scoped advisory lock makes concurrently
+        starting workers wait for the first one instead of racing on DDL.
         """
         logger.debug("Initializing database tables")
         try:
             with self._get_connection() as conn:
                 cur = conn.cursor()
-                # Create wiki table
-                cur.execute("""
-                        CREATE TABLE IF NOT EXISTS wiki(
-                          organization TEXT,
-                          project TEXT,
-                          wiki_identifier TEXT,
-                          created_at TIMESTAMP,
-                          PRIMARY KEY (organization, project, wiki_identifier)
-                        )
-                        """)
-                # Create document table
-                cur.execute("""
-                        CREATE TABLE IF NOT EXISTS document(
-                          file_name TEXT PRIMARY KEY,
-                          created_at TIMESTAMP
-                        )
-                        """)
-                # Create website table
-                cur.execute("""
-                            CREATE TABLE IF NOT EXISTS website(
-                            url TEXT PRIMARY KEY,
-                            created_at TIMESTAMP
-                            )
-                            """)
-
+                cur.execute(_SCHEMA_READY_SQL)
+                if cur.fetchone()[0]:
+                    logger.debug("Database tables already initialized")
+                    return
+
+                # Released on commit; re-probe in case another worker won
+                cur.execute("SELECT pg_advisory_xact_lock(%s)", (_SCHEMA_LOCK_KEY,))
+                cur.execute(_SCHEMA_READY_SQL)
+                if cur.fetchone()[0]:
+                    logger.debug("Database tables initialized by another worker")
+                    return
+                cur.execute(_SCHEMA_DDL)
                 logger.debug("Database tables initialized successfully")
-        except sqlite3.Error as e:
+        except psycopg.Error as e:
             logger.error(f"Failed to initialize database tables: {str(e)}")
             raise
 
-    def add_wiki(self, organization: str, project: str, wiki_identifier: str) -> None:
+    def upsert_wiki(
+        self, organization: str, project: str, wiki_identifier: str
+    ) -> bool:
         """
-        Add a processed wiki to the database.
+        Add a processed wiki to the database unless it is already recorded.
 
         Args:
             organization: Organization name that owns the wiki
             project: Project name that contains the wiki
             wiki_identifier: Unique identifier for the wiki
 
+        Returns:
+            bool: True if the wiki was newly added, False if it already existed
+
         Raises:
-            sqlite3.Error: If database operation fails
+            psycopg.Error: If database operation fails
         """
         logger.debug(
             f"Adding wiki to database: {organization}/{project}/{wiki_identifier}"
@@ -112,26 +282,40 @@ class DatabaseService:
         try:
             with self._get_connection() as conn:
                 cur = conn.cursor()
-                cur.execute(
-                    """
-                          INSERT INTO wiki
-                          (organization, project, wiki_identifier, created_at)
-                          VALUES(%s, %s, %s, %s)
-                          """,
-                    (
-                        organization,
-                        project,
-                        wiki_identifier,
-                        datetime.utcnow(),
-                    ),
+                self._execute_prepared(
+                    cur,
+                    _UPSERT_WIKI_SQL,
+                    (organization, project, wiki_identifier),
                 )
+                added = cur.fetchone() is not None
                 logger.debug(
-                    f"Wiki added successfully: {organization}/{project}/{wiki_identifier}"
+                    f"Wiki added: {added}: {organization}/{project}/{wiki_identifier}"
                 )
-        except sqlite3.Error as e:
+            self._remember(("wiki", organization, project, wiki_identifier))
+            return added
+        except psycopg.Error as e:
             logger.error(f"Failed to add wiki to database: {str(e)}")
             raise
 
+    def add_wiki(self, organization: str, project: str, wiki_identifier: str) -> None:
+        """
+        Add a processed wiki to the database.
+
+        Equivalent to upsert_wiki for callers that don't need the result.
+        """
+        self.upsert_wiki(organization, project, wiki_identifier)
+
+    async def aupsert_wiki(
+        self, organization: str, project: str, wiki_identifier: str
+    ) -> bool:
+        """
+        Async variant of upsert_wiki that keeps the write off the event loop.
+        """
+        return await asyncio.to_thread(
+            self.upsert_wiki, organization, project, wiki_identifier
+        )
+
+    @_retry_transient
     def wiki_exists(
         self,
         organization: str,
@@ -150,59 +334,165 @@ class DatabaseService:
             bool: True if wiki exists in database, False otherwise
 
         Raises:
-            sqlite3.Error: If database operation fails
+            psycopg.Error: If database operation fails
         """
         logger.debug(
             f"Checking if wiki exists: {organization}/{project}/{wiki_identifier}"
         )
+        key = ("wiki", organization, project, wiki_identifier)
+        if key in self._known:
+            return True
         try:
             with self._get_connection() as conn:
                 cur = conn.cursor()
-                cur.execute(
-                    """
-                    SELECT 1 FROM wiki
-                    WHERE organization = %s
-                    AND project = %s
-                    AND wiki_identifier = %s
-                    LIMIT 1
-                    """,
+                self._execute_prepared(
+                    cur,
+                    _WIKI_EXISTS_SQL,
                     (organization, project, wiki_identifier),
                 )
-                result = cur.fetchone()
-                exists = bool(result)
+                exists = cur.fetchone()[0]
                 logger.debug(f"Wiki exists: {exists}")
-                return exists
-        except sqlite3.Error as e:
+            if exists:
+                self._remember(key)
+            return exists
+        except psycopg.Error as e:
             logger.error(f"Failed to check if wiki exists: {str(e)}")
             raise
 
-    def add_document(self, file_name: str) -> None:
+    async def awiki_exists(
+        self, organization: str, project: str, wiki_identifier: str
+    ) -> bool:
         """
-        Add a processed document to the database.
+        Async variant of wiki_exists that keeps the query off the event loop.
+        """
+        return await asyncio.to_thread(
+            self.wiki_exists, organization, project, wiki_identifier
+        )
+
+    def upsert_document(self, file_name: str) -> bool:
+        """
+        Add a processed document to the database unless it is already recorded.
 
         Args:
             file_name: Name of the processed document file
 
+        Returns:
+            bool: True if the document was newly added, False if it already existed
+
         Raises:
-            sqlite3.Error: If database operation fails
+            psycopg.Error: If database operation fails
         """
         logger.debug(f"Adding document to database: {file_name}")
         try:
             with self._get_connection() as conn:
                 cur = conn.cursor()
-                cur.execute(
-                    """
-                            INSERT INTO document
-                            (file_name, created_at)
-                            VALUES (%s, %s)
-                            """,
-                    (file_name, datetime.utcnow()),
+                self._execute_prepared(
+                    cur,
+                    _UPSERT_DOCUMENT_SQL,
+                    (file_name,),
                 )
-                logger.debug(f"Document added successfully: {file_name}")
-        except sqlite3.Error as e:
+                added = cur.fetchone() is not None
+                logger.debug(f"Document added: {added}: {file_name}")
+            self._remember(("document", file_name))
+            return added
+        except psycopg.Error as e:
             logger.error(f"Failed to add document to database: {str(e)}")
             raise
 
+    async def aupsert_document(self, file_name: str) -> bool:
+        """
+        Async variant of upsert_document that keeps the write off the event loop.
+        """
+        return await asyncio.to_thread(self.upsert_document, file_name)
+
+    def add_document(self, file_name: str) -> None:
+        """
+        Add a processed document to the database.
+
+        Args:
+            file_name: Name of the processed document file
+        """
+        self.add_documents_batch([file_name])
+
+    def add_documents_batch(self, file_names: Iterable[str]) -> None:
+        """
+        Add several processed documents to the database in one round-trip.
+
+        Documents that are already recorded are left untouched.
+
+        Args:
+            file_names: Names of the processed document files
+
+        Raises:
+            psycopg.Error: If database operation fails
+        """
+        rows = [(file_name,) for file_name in file_names]
+        if not rows:
+            return
+
+        logger.debug(f"Adding {len(rows)} documents to database")
+        try:
+            with self._get_connection() as conn:
+                cur = conn.cursor()
+                with conn.pipeline():
+                    cur.executemany(_ADD_DOCUMENTS_SQL, rows)
+                logger.debug(f"Documents added successfully: {len(rows)}")
+            for (file_name,) in rows:
+                self._remember(("document", file_name))
+        except psycopg.Error as e:
+            logger.error(f"Failed to add documents to database: {str(e)}")
+            raise
+
+    def existing_chunk_hashes(self, hashes: Sequence[str]) -> Set[str]:
+        """
+        Return which of the given chunk content hashes are already indexed.
+
+        Args:
+            hashes: Content hashes of chunks about to be embedded
+
+        Returns:
+            Set[str]: The subset of hashes already recorded
+
+        Raises:
+            psycopg.Error: If database operation fails
+        """
+        if not hashes:
+            return set()
+
+        try:
+            with self._get_connection() as conn:
+                cur = conn.cursor()
+                self._execute_prepared(cur, _CHUNK_HASHES_SQL, (list(hashes),))
+                return {row[0] for row in cur.fetchall()}
+        except psycopg.Error as e:
+            logger.error(f"Failed to look up chunk hashes: {str(e)}")
+            raise
+
+    def add_chunk_hashes(self, rows: Iterable[Tuple[str, str, str]]) -> None:
+        """
+        Record the content hashes of newly embedded chunks.
+
+        Args:
+            rows: (hash, doc_id, chunk_id) tuples for each stored chunk
+
+        Raises:
+            psycopg.Error: If database operation fails
+        """
+        rows = list(rows)
+        if not rows:
+            return
+
+        logger.debug(f"Adding {len(rows)} chunk hashes to database")
+        try:
+            with self._get_connection() as conn:
+                cur = conn.cursor()
+                with conn.pipeline():
+                    cur.executemany(_ADD_CHUNK_HASHES_SQL, rows)
+        except psycopg.Error as e:
+            logger.error(f"Failed to add chunk hashes to database: {str(e)}")
+            raise
+
+    @_retry_transient
     def document_exists(
         self,
         file_name: str,
@@ -217,58 +507,114 @@ class DatabaseService:
             bool: True if document exists in database, False otherwise
 
         Raises:
-            sqlite3.Error: If database operation fails
+            psycopg.Error: If database operation fails
         """
         logger.debug(f"Checking if document exists: {file_name}")
+        key = ("document", file_name)
+        if key in self._known:
+            return True
         try:
             with self._get_connection() as conn:
                 cur = conn.cursor()
-                cur.execute(
-                    """
-                    SELECT 1 FROM document
-                    WHERE file_name = %s
-                    LIMIT 1
-                    """,
+                self._execute_prepared(
+                    cur,
+                    _DOCUMENT_EXISTS_SQL,
                     (file_name,),
                 )
-                result = cur.fetchone()
-                exists = bool(result)
+                exists = cur.fetchone()[0]
                 logger.debug(f"Document exists: {exists}")
-                return exists
-        except sqlite3.Error as e:
+            if exists:
+                self._remember(key)
+            return exists
+        except psycopg.Error as e:
             logger.error(f"Failed to check if document exists: {str(e)}")
             raise
 
-    def add_website(self, url: str) -> None:
+    async def adocument_exists(self, file_name: str) -> bool:
         """
-        Add a processed website to the database.
+        Async variant of document_exists that keeps the query off the event loop.
+        """
+        return await asyncio.to_thread(self.document_exists, file_name)
+
+    def upsert_website(self, url: str) -> bool:
+        """
+        Add a processed website to the database unless it is already recorded.
 
         Args:
             url: URL of the processed website
 
+        Returns:
+            bool: True if the website was newly added, False if it already existed
+
         Raises:
-            sqlite3.Error: If database operation fails
+            psycopg.Error: If database operation fails
         """
         logger.debug(f"Adding website to database: {url}")
         try:
             with self._get_connection() as conn:
                 cur = conn.cursor()
-                cur.execute(
-                    """
-                            INSERT INTO website
-                            (url, created_at)
-                            VALUES(%s, %s)
-                            """,
-                    (
-                        url,
-                        datetime.utcnow(),
-                    ),
+                self._execute_prepared(
+                    cur,
+                    _UPSERT_WEBSITE_SQL,
+                    (url,),
                 )
-                logger.debug(f"Website added successfully: {url}")
-        except sqlite3.Error as e:
+                added = cur.fetchone() is not None
+                logger.debug(f"Website added: {added}: {url}")
+            self._remember(("website", url))
+            return added
+        except psycopg.Error as e:
             logger.error(f"Failed to add website to database: {str(e)}")
             raise
 
+    def add_website(self, url: str) -> None:
+        """
+        Add a processed website to the database.
+
+        Args:
+            url: URL of the processed website
+        """
+        self.add_websites_batch([url])
+
+    def add_websites_batch(self, urls: Iterable[str]) -> None:
+        """
+        Add several processed websites to the database in one round-trip.
+
+        Websites that are already recorded are left untouched. Batches of
+        _COPY_MIN_ROWS or more, such as the pages of a large sitemap, are
+        streamed with COPY instead of per-row INSERTs.
+
+        Args:
+            urls: URLs of the processed websites
+
+        Raises:
+            psycopg.Error: If database operation fails
+        """
+        rows = [(url,) for url in urls]
+        if not rows:
+            return
+
+        logger.debug(f"Adding {len(rows)} websites to database")
+        try:
+            with self._get_connection() as conn:
+                cur = conn.cursor()
+                if len(rows) >= _COPY_MIN_ROWS:
+                    create_sql, copy_sql, merge_sql = _COPY_WEBSITES_SQL
+                    cur.execute(create_sql)
+                    with cur.copy(copy_sql) as copy:
+                        for row in rows:
+                            copy.write_row(row)
+                    cur.execute(merge_sql)
+                else:
+                    with conn.pipeline():
+                        cur.executemany(_ADD_WEBSITES_SQL, rows)
+                logger.debug(f"Websites added successfully: {len(rows)}")
+            for (url,) in rows:
+                self._remember(("website", url))
+        except psycopg.Error as e:
+            logger.error(f"Failed to add websites to database: {str(e)}")
+            raise
+
+    @_retry_transient
     def website_exists(
         self,
         url: str,
@@ -283,24 +629,68 @@ class DatabaseService:
             bool: True if website exists in database, False otherwise
 
         Raises:
-            sqlite3.Error: If database operation fails
+            psycopg.Error: If database operation fails
         """
         logger.debug(f"Checking if website exists: {url}")
+        key = ("website", url)
+        if key in self._known:
+            return True
         try:
             with self._get_connection() as conn:
                 cur = conn.cursor()
-                cur.execute(
-                    """
-                        SELECT 1 FROM website
-                        WHERE url = %s
-                        LIMIT 1
-                        """,
+                self._execute_prepared(
+                    cur,
+                    _WEBSITE_EXISTS_SQL,
                     (url,),
                 )
-                result = cur.fetchone()
-                exists = bool(result)
+                exists = cur.fetchone()[0]
                 logger.debug(f"Website exists: {exists}")
-                return exists
-        except sqlite3.Error as e:
+            if exists:
+                self._remember(key)
+            return exists
+        except psycopg.Error as e:
             logger.error(f"Failed to check if website exists: {str(e)}")
             raise
+
+    async def awebsite_exists(self, url: str) -> bool:
+        """
+        Async variant of website_exists that keeps the query off the event loop.
+        """
+        return await asyncio.to_thread(self.website_exists, url)
+
+    def existing_websites(self, urls: Sequence[str]) -> Set[str]:
+        """
+        Return which of the given website URLs have already been processed.
+
+        Args:
+            urls: URLs about to be crawled
+
+        Returns:
+            Set[str]: The subset of URLs already recorded
+
+        Raises:
+            psycopg.Error: If database operation fails
+        """
+        known = {url for url in urls if ("website", url) in self._known}
+        unknown = [url for url in urls if url not in known]
+        if not unknown:
+            return known
+
+        try:
+            with self._get_connection() as conn:
+                cur = conn.cursor()
+                self._execute_prepared(cur, _EXISTING_WEBSITES_SQL, (unknown,))
+                found = {row[0] for row in cur.fetchall()}
+        except psycopg.Error as e:
+            logger.error(f"Failed to look up websites: {str(e)}")
+            raise
+
+        for url in found:
+            self._remember(("website", url))
+        return known | found
+
+    async def aexisting_websites(self, urls: Sequence[str]) -> Set[str]:
+        """
+        Async variant of existing_websites that keeps the query off the event loop.
+        """
+        return await asyncio.to_thread(self.existing_websites, urls)
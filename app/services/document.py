@@ -9,17 +9,25 @@ The DocumentService supports multiple document formats (PDF, DOCX) and ensures
 proper validation, error handling, and deduplication of document processing.
 """
 
+import asyncio
+import shutil
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Tuple
 
-from fastapi import HTTPException, status
+from fastapi import HTTPException, UploadFile, status
 from langchain_core.documents import Document
 
 from app.core.config import settings
 from app.services.database import DatabaseService
-from app.services.indexer import IndexerService
+from app.services.indexer import IndexerService, unseen_chunks
 from app.utils.logger import logger
 
+# Leading bytes each supported format must start with, checked before the loader
+_FILE_SIGNATURES: Dict[str, bytes] = {
+    "pdf": b"%PDF-",
+    "docx": b"PK\x03\x04",
+}
+
 
 class DocumentService:
     """
@@ -37,8 +45,10 @@ class DocumentService:
         self.indexer = indexer
         self.database = database
         self.supported_extension = settings.supported_extensions
+        self._supported_formats = ", ".join(sorted(self.supported_extension))
+        self._supported_set = frozenset(self.supported_extension)
         logger.debug(
-            f"Document service initialized with supported extensions: {', '.join(self.supported_extension.keys())}"
+            f"Document service initialized with supported extensions: {self._supported_formats}"
         )
 
     async def _create_docs(self, file_path: Path) -> List[Document]:
@@ -56,19 +66,30 @@ class DocumentService:
         """
         logger.debug(f"Creating documents for file: {file_path}")
 
-        # Extract and validate file extension
-        extension = Path(file_path).suffix.lower().lstrip(".")
+        # Extract the file extension and check the file signature agrees with
+        # it, rejecting misnamed files before the loader tries to parse them
+        extension = file_path.suffix[1:].lower()
+        if extension in _FILE_SIGNATURES:
+            with open(file_path, "rb") as f:
+                signature = f.read(8)
+            if not signature.startswith(_FILE_SIGNATURES[extension]):
+                logger.error(
+                    f"File content does not match its extension: {file_path.name}"
+                )
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"File content is not a valid {extension} document",
+                )
         logger.debug(f"Detected file extension: {extension}")
 
         # Check if file format is supported
-        if extension not in self.supported_extension:
-            supported_formats = ", ".join(self.supported_extension.keys())
+        if extension not in self._supported_set:
             logger.error(
-                f"Unsupported file format: {extension}. Supported formats: {supported_formats}"
+                f"Unsupported file format: {extension}. Supported formats: {self._supported_formats}"
             )
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Unsupported file format. Supported formats: {supported_formats}",
+                detail=f"Unsupported file format. Supported formats: {self._supported_formats}",
             )
 
         try:
@@ -76,7 +97,8 @@ class DocumentService:
             loader_class = self.supported_extension[extension]
             logger.debug(f"Using loader class: {loader_class.__name__}")
 
-            docs = loader_class(str(file_path)).load()
+            # Parsing is blocking, so run it off the event loop
+            docs = await asyncio.to_thread(loader_class(str(file_path)).load)
             logger.debug(f"Created {len(docs)} documents from file: {file_path.name}")
 
             return docs
@@ -117,24 +139,46 @@ class DocumentService:
 
             # Split documents into chunks
             logger.debug("Splitting documents into chunks")
-            chunks = self.indexer.text_splitter.split_documents(docs)
+            chunks = await asyncio.to_thread(
+                self.indexer.text_splitter.split_documents, docs
+            )
             logger.debug(f"Split documents into {len(chunks)} chunks")
 
+            # Only embed chunks whose text hasn't been indexed before
+            new_chunks = await asyncio.to_thread(unseen_chunks, chunks, self.database)
+            logger.debug(
+                f"Skipping {len(chunks) - len(new_chunks)} already indexed chunks"
+            )
+
             # Add chunks to vector store
             logger.debug("Adding chunks to vector store")
-            await self.indexer.vector_store.aadd_documents(chunks)
+            # Stored under their content hash, so chunks shared with a
+            # document indexed concurrently, or re-added after a partial
+            # failure, overwrite rather than duplicate
+            await self.indexer.aadd_documents(
+                list(new_chunks.values()), ids=list(new_chunks)
+            )
             logger.debug("Successfully added chunks to vector store")
 
-            # Record document in database
-            self.database.add_document(Path(file_path).name)
+            # Record document and chunk hashes in database
+            file_name = file_path.name
+            await asyncio.to_thread(
+                self.database.add_chunk_hashes,
+                [(chunk_hash, file_name, chunk_hash) for chunk_hash in new_chunks],
+            )
+            await self.database.aupsert_document(file_name)
             logger.info(f"Successfully processed document: {file_path.name}")
 
             return {
                 "status": "Successfully indexed file",
-                "file_name": Path(file_path).name,
+                "file_name": file_name,
                 "chunks": len(chunks),
+                "new_chunks": len(new_chunks),
             }
 
+        except HTTPException:
+            # Already carries the right status, such as a 400 for a bad file
+            raise
         except Exception as e:
             logger.error(f"Error processing document {file_path.name}: {str(e)}")
             raise HTTPException(
@@ -142,12 +186,17 @@ class DocumentService:
                 detail=f"Failed to process document: {str(e)}",
             )
 
-    async def index_document(self, content: bytes, file_name: str) -> Dict[str, Any]:
+    async def index_document(
+        self, upload_file: UploadFile, file_name: str
+    ) -> Dict[str, Any]:
         """
-        Save and index a document from uploaded content.
+        Save and index a document from an uploaded file.
+
+        The upload is copied to disk in 1 MiB blocks rather than read into
+        memory, keeping peak memory flat for large files.
 
         Args:
-            content: Binary content of the uploaded document
+            upload_file: Uploaded document file
             file_name: Name of the document file
 
         Returns:
@@ -160,7 +209,7 @@ class DocumentService:
 
         try:
             # Check if document already exists
-            document_exists = self.database.document_exists(file_name)
+            document_exists = await self.database.adocument_exists(file_name)
             if document_exists:
                 logger.info(f"Document {file_name} is already processed, skipping")
                 return {"status": "Document already processed"}
@@ -172,15 +221,69 @@ class DocumentService:
             # Save file to disk
             file_path = docs_dir / file_name
             with open(file_path, "wb") as f:
-                f.write(content)
+                await asyncio.to_thread(
+                    shutil.copyfileobj, upload_file.file, f, 1 << 20
+                )
             logger.debug(f"Saved document to: {file_path}")
 
             # Process the saved document
             return await self.process_document(file_path)
 
+        except HTTPException:
+            raise
         except Exception as e:
             logger.error(f"Error indexing document {file_name}: {str(e)}")
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Failed to index document: {str(e)}",
             )
+
+    async def index_documents(
+        self, items: List[Tuple[UploadFile, str]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Save and index several uploaded documents concurrently.
+
+        At most ``settings.ingest_concurrency`` documents are processed at
+        once, so parsing, embedding and database writes of different files
+        overlap. A failing document does not abort the others. A file name
+        repeated within the batch is only indexed for its first upload; the
+        others would write to the same path at the same time.
+
+        Args:
+            items: (uploaded file, file name) pairs
+
+        Returns:
+            List[Dict[str, Any]]: Processing status per document, in input order
+        """
+        semaphore = asyncio.Semaphore(settings.ingest_concurrency)
+
+        # Position of the first upload of each file name
+        first_index: Dict[str, int] = {}
+        for index, (_, file_name) in enumerate(items):
+            first_index.setdefault(file_name, index)
+
+        async def index_one(
+            index: int, upload_file: UploadFile, file_name: str
+        ) -> Dict[str, Any]:
+            if first_index[file_name] != index:
+                logger.warning(f"Skipping duplicate file name in batch: {file_name}")
+                return {
+                    "status": "Failed to index file",
+                    "file_name": file_name,
+                    "detail": "Duplicate file name in batch",
+                }
+            async with semaphore:
+                try:
+                    return await self.index_document(upload_file, file_name)
+                except HTTPException as e:
+                    return {
+                        "status": "Failed to index file",
+                        "file_name": file_name,
+                        "detail": e.detail,
+                    }
+
+        logger.info(f"Indexing {len(items)} documents")
+        return await asyncio.gather(
+            *(index_one(i, f, name) for i, (f, name) in enumerate(items))
+        )
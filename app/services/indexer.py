@@ -11,16 +11,183 @@ The IndexerService is a core component used by other services to index and retri
 content from various sources (documents, websites, wikis).
 """
 
-from typing import Optional
+import asyncio
+import hashlib
+from functools import lru_cache
+from typing import Dict, List, Optional
+from uuid import uuid4
 
+import numpy as np
 from chromadb.config import Settings
+from langchain_core.documents import Document
 from langchain_chroma import Chroma
 from langchain_openai import AzureOpenAIEmbeddings
-from langchain_text_splitters.character import RecursiveCharacterTextSplitter
+from semantic_text_splitter import TextSplitter
 
 from app.core.config import settings
+from app.services.database import DatabaseService
 from app.utils.logger import logger
 
+# Model whose tokenizer (cl100k_base) measures chunks when the embedding
+# model's name isn't one tiktoken knows
+_FALLBACK_TOKENIZER_MODEL = "text-embedding-3-small"
+
+
+class DocumentSplitter:
+    """
+    Adapter exposing LangChain's ``split_documents`` over a native splitter.
+
+    Wraps ``semantic_text_splitter.TextSplitter`` so chunking runs in Rust
+    while callers keep receiving LangChain ``Document`` objects with the
+    source document's metadata. Chunk sizes are measured in tokens of the
+    embedding model, counted by the splitter's native tiktoken encoder.
+    """
+
+    def __init__(self, model: str, chunk_size: int, chunk_overlap: int):
+        """
+        Initialize the splitter.
+
+        Args:
+            model: OpenAI model whose tokenizer measures chunk length
+            chunk_size: Maximum chunk size in tokens
+            chunk_overlap: Overlap between consecutive chunks in tokens
+        """
+        try:
+            self._splitter = TextSplitter.from_tiktoken_model(
+                model, chunk_size, overlap=chunk_overlap
+            )
+        except Exception as e:
+            # tiktoken only knows OpenAI model names, not Azure deployment
+            # names or other providers' models; its own error type is a bare
+            # Exception
+            logger.warning(
+                f"No tokenizer for model {model} ({e}), counting tokens with {_FALLBACK_TOKENIZER_MODEL}"
+            )
+            self._splitter = TextSplitter.from_tiktoken_model(
+                _FALLBACK_TOKENIZER_MODEL, chunk_size, overlap=chunk_overlap
+            )
+
+    def split_documents(self, docs: List[Document]) -> List[Document]:
+        """
+        Split documents into chunks.
+
+        All texts go to the native splitter in one call, which releases the
+        GIL and splits them in parallel across cores.
+
+        Args:
+            docs: Documents to split
+
+        Returns:
+            List[Document]: Chunks carrying the metadata of their source document
+        """
+        chunk_lists = self._splitter.chunk_all([doc.page_content for doc in docs])
+        return [
+            Document(page_content=chunk, metadata=dict(doc.metadata))
+            for doc, chunks in zip(docs, chunk_lists)
+            for chunk in chunks
+        ]
+
+
+@lru_cache(maxsize=1)
+def _get_embedding_model() -> AzureOpenAIEmbeddings:
+    """
+    Build the Azure OpenAI embedding model, once per process.
+    """
+    return AzureOpenAIEmbeddings(
+        model=settings.embedding_model,
+        api_key=settings.azure_openai_api_key,
+        azure_endpoint=settings.azure_embedding_endpoint,
+        api_version=settings.embedding_api_version,
+        dimensions=settings.embedding_dimensions,
+    )
+
+
+# Index and flush the HNSW graph in larger batches so a document's chunks are
+# applied with few index updates and disk persists
+_HNSW_METADATA = {
+    "hnsw:batch_size": 500,
+    "hnsw:sync_threshold": 5000,
+}
+
+
+@lru_cache(maxsize=1)
+def _get_vector_store() -> Chroma:
+    """
+    Open the persistent Chroma vector store, once per process.
+
+    collection_metadata only applies when Chroma creates the collection, so a
+    collection created earlier is updated to the HNSW settings here; Chroma
+    applies them the next time it loads the collection's index.
+    """
+    # Create vector store directory if it doesn't exist
+    vector_store_path = settings.data_dir / "vector_store"
+    vector_store_path.mkdir(parents=True, exist_ok=True)
+
+    # Initialize Chroma vector store with embedding model
+    store = Chroma(
+        persist_directory=str(vector_store_path),
+        embedding_function=_get_embedding_model(),
+        client_settings=Settings(
+            anonymized_telemetry=False,  # Disable telemetry for production
+            is_persistent=True,  # Ensure data persistence
+        ),
+        collection_metadata=_HNSW_METADATA,
+    )
+
+    metadata = store._collection.metadata or {}
+    if any(metadata.get(key) != value for key, value in _HNSW_METADATA.items()):
+        # modify replaces the metadata and refuses any hnsw:space key, so a
+        # collection with an explicit distance function is left as it is
+        if "hnsw:space" in metadata:
+            logger.warning("Vector store HNSW settings not applied: hnsw:space is set")
+        else:
+            try:
+                store._collection.modify(metadata={**metadata, **_HNSW_METADATA})
+                logger.debug("Applied HNSW settings to existing vector store")
+            except Exception as e:
+                logger.warning(f"Failed to apply HNSW settings to vector store: {e}")
+    return store
+
+
+@lru_cache(maxsize=1)
+def _get_text_splitter() -> DocumentSplitter:
+    """
+    Build the document text splitter, once per process.
+    """
+    # Configure text splitter with appropriate chunk size and overlap
+    return DocumentSplitter(
+        model=settings.embedding_model,
+        chunk_size=500,  # Size of text chunks in tokens (~2000 characters)
+        chunk_overlap=100,  # Overlap between chunks to maintain context
+    )
+
+
+def unseen_chunks(
+    chunks: List[Document], database: DatabaseService
+) -> Dict[str, Document]:
+    """
+    Drop chunks whose content has already been embedded.
+
+    Chunks repeated within the batch are kept once, and chunks whose hash is
+    already recorded in the database are dropped.
+
+    Args:
+        chunks: Chunks produced by the text splitter
+        database: Service holding the hashes of indexed chunks
+
+    Returns:
+        Dict[str, Document]: Remaining chunks keyed by content hash
+    """
+    by_hash: Dict[str, Document] = {}
+    for chunk in chunks:
+        digest = hashlib.blake2b(
+            chunk.page_content.encode(), digest_size=16
+        ).hexdigest()
+        by_hash.setdefault(digest, chunk)
+
+    known = database.existing_chunk_hashes(list(by_hash))
+    return {h: chunk for h, chunk in by_hash.items() if h not in known}
+
 
 class IndexerService:
     """
@@ -32,8 +199,8 @@ class IndexerService:
     - Vector store: Stores and retrieves embeddings efficiently
     - Text splitter: Splits documents into chunks for processing
 
-    The service initializes these components on creation and provides
-    them to other services for document processing and retrieval.
+    The components are process-wide singletons built on first use, so
+    additional IndexerService instances are cheap views over them.
     """
 
     def __init__(self):
@@ -46,7 +213,7 @@ class IndexerService:
         # Initialize component placeholders
         self.vector_store: Optional[Chroma] = None
         self.embedding_model: Optional[AzureOpenAIEmbeddings] = None
-        self.text_splitter: Optional[RecursiveCharacterTextSplitter] = None
+        self.text_splitter: Optional[DocumentSplitter] = None
 
         # Perform initialization of components
         self._initialize()
@@ -77,13 +244,7 @@ class IndexerService:
         """
         logger.debug("Initializing embedding model")
         try:
-            embedding_model = settings.embedding_model
-            self.embedding_model = AzureOpenAIEmbeddings(
-                model=embedding_model,
-                api_key=settings.azure_openai_api_key,
-                azure_endpoint=settings.azure_embedding_endpoint,
-                api_version=settings.embedding_api_version,
-            )
+            self.embedding_model = _get_embedding_model()
             logger.debug("Embedding model initialized successfully")
         except Exception as e:
             logger.error(f"Failed to initialize embedding model: {str(e)}")
@@ -98,19 +259,7 @@ class IndexerService:
         """
         logger.debug("Initializing Vector store")
         try:
-            # Create vector store directory if it doesn't exist
-            vector_store_path = settings.data_dir / "vector_store"
-            vector_store_path.mkdir(parents=True, exist_ok=True)
-
-            # Initialize Chroma vector store with embedding model
-            self.vector_store = Chroma(
-                persist_directory=str(vector_store_path),
-                embedding_function=self.embedding_model,
-                client_settings=Settings(
-                    anonymized_telemetry=False,  # Disable telemetry for production
-                    is_persistent=True,  # Ensure data persistence
-                ),
-            )
+            self.vector_store = _get_vector_store()
             logger.debug("Vector store initialized successfully")
         except Exception as e:
             logger.error(f"Failed to initialize vector store: {str(e)}")
@@ -120,20 +269,78 @@ class IndexerService:
         """
         Initialize the text splitter for document chunking.
 
-        Creates a RecursiveCharacterTextSplitter with appropriate settings
-        for splitting documents into manageable chunks for embedding.
+        Creates a DocumentSplitter backed by the native semantic-text-splitter,
+        which picks chunk boundaries by semantic level (paragraphs, sentences,
+        words) for splitting documents into manageable chunks for embedding.
         """
         logger.debug("Initializing text splitter")
         try:
-            # Configure text splitter with appropriate chunk size and overlap
-            self.text_splitter = RecursiveCharacterTextSplitter(
-                chunk_size=2000,  # Size of text chunks in characters
-                chunk_overlap=400,  # Overlap between chunks to maintain context
-                length_function=len,  # Function to measure text length
-                # Separators in order of preference for splitting text
-                separators=["\n\n", "\n", ".", "?", "!", " ", ""],
-            )
+            self.text_splitter = _get_text_splitter()
             logger.debug("Text splitter initialized successfully")
         except Exception as e:
             logger.error(f"Failed to initialize text splitter: {str(e)}")
             raise
+
+    async def aadd_documents(
+        self, docs: List[Document], ids: Optional[List[str]] = None
+    ) -> List[str]:
+        """
+        Embed documents in batches and add them to the vector store.
+
+        Chunks are grouped into batches of ``settings.embedding_batch_size``
+        and embedded concurrently, with at most ``settings.embedding_concurrency``
+        requests in flight against the embedding endpoint. The precomputed
+        vectors are then added to the Chroma collection directly as a
+        single float32 array.
+
+        When ids are given, such as chunk content hashes, the chunks are
+        upserted, so adding the same chunks again after a partial failure
+        doesn't store duplicates.
+
+        Args:
+            docs: Document chunks to embed and store
+            ids: IDs to store the chunks under, random if omitted
+
+        Returns:
+            List[str]: IDs assigned to the stored chunks
+        """
+        if not docs:
+            return []
+
+        batch_size = settings.embedding_batch_size
+        semaphore = asyncio.Semaphore(settings.embedding_concurrency)
+        batches = [docs[i : i + batch_size] for i in range(0, len(docs), batch_size)]
+
+        async def embed(batch: List[Document]) -> List[List[float]]:
+            async with semaphore:
+                return await self.embedding_model.aembed_documents(
+                    [doc.page_content for doc in batch]
+                )
+
+        logger.debug(f"Embedding {len(docs)} chunks in {len(batches)} batches")
+        vectors = await asyncio.gather(*(embed(batch) for batch in batches))
+
+        # One contiguous float32 matrix for the whole document, filled batch
+        # by batch, written in as few collection.add calls as Chroma allows
+        embeddings = np.empty((len(docs), len(vectors[0][0])), dtype=np.float32)
+        for index, batch_vectors in enumerate(vectors):
+            start = index * batch_size
+            embeddings[start : start + len(batch_vectors)] = batch_vectors
+        if ids is None:
+            ids = [uuid4().hex for _ in docs]
+            write = self.vector_store._collection.add
+        else:
+            write = self.vector_store._collection.upsert
+        step = self.vector_store._client.get_max_batch_size()
+        for start in range(0, len(docs), step):
+            end = start + step
+            await asyncio.to_thread(
+                write,
+                ids=ids[start:end],
+                embeddings=embeddings[start:end],
+                documents=[doc.page_content for doc in docs[start:end]],
+                metadatas=[doc.metadata or None for doc in docs[start:end]],
+            )
+
+        logger.debug(f"Added {len(ids)} chunks to vector store")
+        return ids
@@ -1,16 +1,26 @@
-from typing import Dict, List
+from typing import List, Optional, Tuple
 
 from langgraph.checkpoint.postgres.aio import AsyncPostgresSaver
-from psycopg.rows import dict_row
+from psycopg.rows import class_row, dict_row
 from psycopg_pool import AsyncConnectionPool
 
 from app.core.config import settings
+from app.models.memory import CheckpointRow
 from app.utils.logger import logger
 
+# Serves get_conversation_history's per-thread lookup of top-level checkpoints
+# ordered by (step, checkpoint_id) without a sort. CONCURRENTLY needs
+# autocommit, which the pool connections use.
+_CHECKPOINT_STEP_INDEX_SQL = """
+    CREATE INDEX CONCURRENTLY IF NOT EXISTS checkpoints_thread_ns_step_idx
+    ON checkpoints (thread_id, checkpoint_ns, ((metadata->>'step')::int), checkpoint_id)
+"""
+
 
 class MemoryService:
     def __init__(self):
         self._pool = None
+        self._saver: Optional[AsyncPostgresSaver] = None
 
     async def get_pool(self) -> AsyncConnectionPool:
         """
@@ -30,6 +40,7 @@ class MemoryService:
                 open=False,
                 kwargs={
                     "autocommit": True,
+                    # Prepare statements server-side on first execution
                     "prepare_threshold": 0,
                     "row_factory": dict_row,
                 },
@@ -51,16 +62,33 @@ class MemoryService:
         Returns:
             AsyncPostgresSaver: Async postgressql memory saver for langgraph
         """
-        pool = await self.get_pool()
-        # Get a connection from the pool but don't close it after the block
-        # because AsyncPostgresSaver needs to keep it
-        logger.debug("Getting connection...")
-        conn = await pool.getconn()
+        if self._saver is None:
+            # Backed by the pool itself, so each checkpoint operation borrows
+            # a connection and returns it instead of pinning one forever
+            pool = await self.get_pool()
+            self._saver = AsyncPostgresSaver(pool)
 
-        # Create the memory saver with the connection
-        memory = AsyncPostgresSaver(conn)
+        return self._saver
+
+    async def startup(self):
+        """
+        Open the connection pool and setup the checkpoint tables.
+        Called from the application lifespan so the first user turn
+        doesn't pay for opening the pool
+        """
+        await self.get_pool()
+        await self.setup_memory_table()
 
-        return memory
+    async def aclose(self):
+        """
+        Close the connection pool, releasing all memory connections.
+        This should be called once during application shutdown
+        """
+        if self._pool is not None:
+            await self._pool.close()
+            self._pool = None
+            self._saver = None
+            logger.debug("Connection pool closed.")
 
     async def setup_memory_table(self):
         """
@@ -72,25 +100,45 @@ class MemoryService:
             async with pool.connection() as conn:
                 memory = AsyncPostgresSaver(conn)
                 await memory.setup()
+                await conn.execute(_CHECKPOINT_STEP_INDEX_SQL)
                 logger.debug("Postgres tables for agent memory has been setup.")
         except Exception as e:
             logger.error(f"Error connecting to the database: {e}")
 
-    async def get_conversation_history(self, thread_id: str) -> List[Dict]:
+    async def get_conversation_history(
+        self,
+        thread_id: str,
+        after: Optional[Tuple[int, str]] = None,
+        limit: Optional[int] = None,
+    ) -> List[CheckpointRow]:
         """
         Retrieve the conversation history (checkpoints) for a given thread_id.
 
+        Only top-level checkpoints are returned; subgraph checkpoints reuse
+        the same step numbers. The full history is returned unless a limit is
+        given, in which case pass the (step, checkpoint_id) of the last
+        checkpoint received as after to fetch the next page.
+
         Args:
             thread_id (str): The unique identifier for the conversation/thread.
+            after (Optional[Tuple[int, str]]): Only return checkpoints after this
+                (step, checkpoint_id).
+            limit (Optional[int]): Maximum number of checkpoints to return.
 
         Returns:
-            List[Dict]: A list of dictionaries representing each checkpoint entry
-                        in the conversation, ordered by the 'step' field from metadata.
+            List[CheckpointRow]: Each checkpoint entry in the conversation,
+                                 ordered by the 'step' field from metadata.
         """
+        params = (thread_id, limit) if after is None else (thread_id, *after, limit)
+        after_filter = (
+            ""
+            if after is None
+            else "AND ((metadata->>'step')::int, checkpoint_id) > (%s, %s)"
+        )
         try:
             pool = await self.get_pool()
             async with pool.connection() as conn:
-                query = """
+                query = f"""
                     SELECT thread_id,
                            checkpoint_ns,
                            checkpoint_id,
@@ -99,11 +147,12 @@ class MemoryService:
                            checkpoint,
                            metadata
                     FROM checkpoints
-                    WHERE thread_id = %s
-                    ORDER BY (metadata->>'step')::int ASC;
+                    WHERE thread_id = %s AND checkpoint_ns = '' {after_filter}
+                    ORDER BY (metadata->>'step')::int ASC, checkpoint_id ASC
+                    LIMIT %s;
                 """
-                async with conn.cursor() as cur:
-                    await cur.execute(query, (thread_id,))
+                async with conn.cursor(row_factory=class_row(CheckpointRow)) as cur:
+                    await cur.execute(query, params, prepare=True)
                     rows = await cur.fetchall()
                     logger.debug(
                         "Fetched conversation history for thread_id: %s", thread_id
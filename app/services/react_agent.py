@@ -1,30 +1,71 @@
-from typing import Optional, Sequence, Union, cast
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Sequence, Tuple, Union, cast
 
 from langchain_core.language_models import LanguageModelLike
-from langchain_core.messages import AIMessage, BaseMessage, SystemMessage, ToolMessage
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
+from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain_core.runnables import RunnableConfig
 from langchain_core.tools import BaseTool
+from langgraph.constants import TAG_NOSTREAM
 from langgraph.graph import END, StateGraph
 from langgraph.prebuilt.tool_node import ToolNode
 from langgraph.store.base import BaseStore
 from langgraph.types import Checkpointer, Send
 
 from app.models.agentstate import AgentState
+from app.services.answer_cache import SemanticAnswerCache
 from app.utils.logger import logger
 
+# Compiled agents keyed by model, tools, prompt, checkpointer and answer
+# cache. Values also hold the objects whose ids are in the key so the ids can't
+# be reused while cached.
+_COMPILED_GRAPHS: Dict[Tuple, Tuple[Any, Any, Any, Any, Any]] = {}
+
+# Tool-bound models keyed by base model and tools, holding the base model and
+# tools so their ids can't be reused while cached
+_BOUND_MODELS: Dict[Tuple, Tuple[Any, Any, Any]] = {}
+
+# Threads whose running summary of dropped history is kept in memory
+_MAX_SUMMARIES = 1024
+
+_SUMMARY_PROMPT = """
+Summarize the earlier part of a conversation between a user and an assistant.
+Keep the user's goals, facts established, tool results relied upon and any open questions.
+Be concise; the summary replaces these messages in the assistant's context.
+"""
+
+
+def _history_start(messages: Sequence[BaseMessage], max_messages: int) -> int:
+    """Index of the first message kept when truncating to about max_messages."""
+    if len(messages) <= max_messages:
+        return 0
+    # Advance the window start in steps of half the window rather than one
+    # message per turn, so the prompt prefix stays identical across turns
+    # and the provider's prefix cache keeps hitting until the next jump
+    step = max(1, max_messages // 2)
+    cutoff = -(-(len(messages) - max_messages) // step) * step
+    # Move backwards to the nearest AIMessage to ensure we don't start with
+    # a ToolMessage
+    return next((i for i in range(cutoff, 0, -1) if messages[i].type == "ai"), 0)
+
 
 def get_truncated_history(
     messages: Sequence[BaseMessage], max_messages: int = 25
 ) -> Sequence[BaseMessage]:
     """Truncate the message history to the last max_messages while ensuring complete context for tool messages."""
-    if len(messages) <= max_messages:
-        return messages
-    # Start with the last max_messages
-    idx = len(messages) - max_messages
-    # Move backwards until we find an AIMessage to ensure we don't start with a ToolMessage
-    while idx > 0 and not isinstance(messages[idx], AIMessage):
-        idx -= 1
-    return messages[idx:]
+    return messages[_history_start(messages, max_messages) :]
+
+
+def _bind_tools(
+    model: LanguageModelLike, tools: Sequence[BaseTool]
+) -> LanguageModelLike:
+    """Bind tools to a model, reusing the binding for the same model and tools."""
+    # Keyed on the tool objects rather than their names: tools of another
+    # instance may share names but close over different state
+    key = (id(model), tuple(id(t) for t in tools))
+    if key not in _BOUND_MODELS:
+        _BOUND_MODELS[key] = (model.bind_tools(tools), model, tuple(tools))
+    return _BOUND_MODELS[key][0]
 
 
 def create_react_agent(
@@ -32,30 +73,125 @@ def create_react_agent(
     tools: Sequence[BaseTool],
     prompt: Optional[str] = None,
     checkpointer: Optional[Checkpointer] = None,
+    debug: bool = False,
+    answer_cache: Optional[SemanticAnswerCache] = None,
+) -> StateGraph:
+    """Creates a ReAct agent, reusing the compiled graph for identical arguments.
+
+    debug enables LangGraph's per-step tracing, which is too costly to leave on
+    outside local troubleshooting. answer_cache, if given, answers opening
+    questions similar to earlier ones without running the loop.
+    """
+    key = (
+        id(model),
+        tuple(id(t) for t in tools),
+        prompt,
+        id(checkpointer),
+        debug,
+        id(answer_cache),
+    )
+    if key not in _COMPILED_GRAPHS:
+        graph = _build_react_agent(
+            model, tools, prompt, checkpointer, debug, answer_cache
+        )
+        _COMPILED_GRAPHS[key] = (graph, model, checkpointer, answer_cache, tuple(tools))
+    return _COMPILED_GRAPHS[key][0]
+
+
+def _build_react_agent(
+    model: Union[str, LanguageModelLike],
+    tools: Sequence[BaseTool],
+    prompt: Optional[str] = None,
+    checkpointer: Optional[Checkpointer] = None,
+    debug: bool = False,
+    answer_cache: Optional[SemanticAnswerCache] = None,
 ) -> StateGraph:
     """Creates a ReAct agent using LangGraph and LangChain components."""
     # Setup tools
-    debug: bool = False
     store: BaseStore = None
     tool_node = ToolNode(tools)
     tool_calling_enabled = bool(tools)
-    model = model.bind_tools(tools)
+    summary_model = model.with_config(tags=[TAG_NOSTREAM])
+    model = _bind_tools(model, tools)
 
     # Create system message and model chain
+    # The system message is passed as a message object, not a template
+    # string, so braces in the prompt aren't treated as variables
     system_message = SystemMessage(content=prompt or "")
-    model_runnable = (
-        lambda state: [system_message] + get_truncated_history(state["messages"], 25)
-    ) | model
+    prompt_template = ChatPromptTemplate.from_messages(
+        [system_message, MessagesPlaceholder(variable_name="messages")]
+    )
+    model_runnable = prompt_template | model
+
+    # Per thread: (number of leading messages summarized, summary text)
+    summaries: OrderedDict[str, Tuple[int, str]] = OrderedDict()
+
+    async def summarize(
+        thread_id: str, messages: Sequence[BaseMessage], start: int
+    ) -> str:
+        """Summary of messages[:start], extended incrementally as the window moves."""
+        covered, summary = summaries.pop(thread_id, (0, ""))
+        if covered > start:
+            # History is shorter than what was summarized; start over
+            covered, summary = 0, ""
+        if covered < start:
+            transcript = "\n".join(
+                f"{m.type}: {m.content}" for m in messages[covered:start]
+            )
+            result = await summary_model.ainvoke(
+                [
+                    SystemMessage(content=_SUMMARY_PROMPT),
+                    HumanMessage(
+                        content=f"Summary so far:\n{summary}\n\nNew messages:\n{transcript}"
+                    ),
+                ]
+            )
+            covered, summary = start, result.content
+        summaries[thread_id] = (covered, summary)
+        if len(summaries) > _MAX_SUMMARIES:
+            summaries.popitem(last=False)
+        return summary
 
     async def call_model(state: AgentState, config: RunnableConfig) -> AgentState:
-        response = cast(AIMessage, await model_runnable.ainvoke(state, config))
-        logger.debug(f"Remaining steps :{state['remaining_steps']}")
+        messages = state["messages"]
+
+        # Only the opening question of a conversation is cached; later ones
+        # depend on the context before them
+        question = None
+        if answer_cache is not None:
+            questions = [m for m in messages if m.type == "human"]
+            if len(questions) == 1 and isinstance(questions[0].content, str):
+                question = questions[0].content
+        if question is not None and messages[-1].type == "human":
+            answer = await answer_cache.aget(question)
+            if answer is not None:
+                return {"messages": [AIMessage(content=answer)]}
+
+        start = _history_start(messages, 25)
+        history = messages[start:]
+        # Replace dropped messages with a summary instead of losing them. The
+        # summary only changes when the window start moves, keeping the
+        # prompt prefix stable between jumps.
+        thread_id = config.get("configurable", {}).get("thread_id")
+        if start and thread_id:
+            summary = await summarize(thread_id, messages, start)
+            history = [
+                SystemMessage(content=f"Summary of earlier conversation:\n{summary}"),
+                *history,
+            ]
+
+        response = cast(
+            AIMessage, await model_runnable.ainvoke({"messages": history}, config)
+        )
+        # Managed values, always present in the state
+        is_last_step = state["is_last_step"]
+        remaining_steps = state["remaining_steps"]
+        logger.debug("Remaining steps :%s", remaining_steps)
 
         # Check if we need to stop due to step limitations
-        has_tool_calls = isinstance(response, AIMessage) and response.tool_calls
-        if (state.get("is_last_step", False) and has_tool_calls) or (
-            "remaining_steps" in state
-            and state["remaining_steps"] < (1 if not has_tool_calls else 2)
+        has_tool_calls = bool(response.tool_calls)
+        if (is_last_step and has_tool_calls) or remaining_steps < (
+            1 if not has_tool_calls else 2
         ):
             return {
                 "messages": [
@@ -65,6 +201,8 @@ def create_react_agent(
                     )
                 ]
             }
+        if question is not None and not has_tool_calls and response.content:
+            await answer_cache.aput(question, response.content)
         return {"messages": [response]}
 
     # Create workflow graph
@@ -83,16 +221,17 @@ def create_react_agent(
     # Define tool execution logic
     def should_continue(state: AgentState) -> Union[str, list]:
         last_message = state["messages"][-1]
-        if not isinstance(last_message, AIMessage) or not last_message.tool_calls:
+        if not getattr(last_message, "tool_calls", None):
             logger.debug("No further tool calls. Ending....")
             return END
-        tool_calls = [
-            tool_node.inject_tool_args(call, state, store)
-            for call in last_message.tool_calls
-        ]
-        for tool_call in last_message.tool_calls:
-            logger.debug(f"Calling tool : {tool_call}")
-        return [Send("tools", [tool_call]) for tool_call in tool_calls]
+        # A single Send carries the whole batch: ToolNode runs the calls
+        # concurrently and returns their ToolMessages in call order, with one
+        # task and one checkpoint write instead of one per call
+        tool_calls = []
+        for call in last_message.tool_calls:
+            logger.debug("Calling tool : %s", call)
+            tool_calls.append(tool_node.inject_tool_args(call, state, store))
+        return [Send("tools", tool_calls)]
 
     workflow.add_conditional_edges(
         "agent",
@@ -112,7 +251,7 @@ def create_react_agent(
 
         def route_tool_responses(state: AgentState):
             for msg in reversed(state["messages"]):
-                if not isinstance(msg, ToolMessage):
+                if msg.type != "tool":
                     break
                 if msg.name in direct_return_tools:
                     return END
@@ -1,3 +1,8 @@
+import asyncio
+from functools import cached_property
+from typing import List, Optional, Union
+
+from langchain_core.documents import Document
 from langchain_core.tools import tool
 from langchain_core.tools.base import BaseTool
 
@@ -7,6 +12,23 @@ from app.services.memory import MemoryService
 from app.services.react_agent import create_react_agent
 from app.utils.logger import logger
 
+_RETRIEVAL_PROMPT = """
+You are a specialized document retrieval assistant. Your task is to find information from a knowledge base.
+Use the retrieved content to answer the user's question. If the user's question is answered without information from the document, answer directly.
+
+**FOLLOW THESE STEPS FOR EACH QUERY:**
+    1. Analyze the query to identify key concepts and information needs.
+    2. If the query is a general greeting (e.g., "hi", "hello", "how are you?"), respond directly without retrieving documents.
+    3. Otherwise, use the `retrieve_document` tool with precise search terms.
+    4. Present the most relevant informants.
+    5. If information is not found, clearly state this limitation from retrieved documetion.
+
+**IMPORTANT**:
+- Base your responses ONLY on the retrieved documents when applicable. Do not invent or assume information.
+- Clearly distinguish between direct information from documents and any necessary inferences.
+- Respond to simple greetings or small talk directly without document retrieval.
+"""
+
 
 class RetrievalAgent:
     """
@@ -21,9 +43,60 @@ class RetrievalAgent:
         Args:
             indexer (IndexerService): Service for document indexing and retrieval
         """
-        self.llm = settings.local_llm
         self.indexer = indexer
-        self.tools = [self._create_retrieval_tool()]
+
+    @cached_property
+    def llm(self):
+        """
+        Chat model for the agent, created on first use rather than at construction.
+        """
+        return settings.local_llm
+
+    @cached_property
+    def tools(self) -> List[BaseTool]:
+        """
+        Tools available to the agent, built on first use.
+        """
+        return [self._create_retrieval_tool()]
+
+    async def _search(self, queries: List[str], k: int = 5) -> List[List[Document]]:
+        """
+        Find the k most similar chunks for each query.
+
+        Each query is embedded with the async client's aembed_query, which
+        applies any query-specific embedding behaviour, and searched in the
+        store concurrently, so no blocking embedding request runs on the
+        thread pool.
+
+        Args:
+            queries: Search queries
+            k: Number of chunks to return per query
+
+        Returns:
+            List[List[Document]]: Matching chunks for each query, in order
+
+        Raises:
+            ValueError: If the vector store is not initialized
+        """
+        if not self.indexer.vector_store:
+            raise ValueError("Vector store is not initialized")
+
+        async def search(query: str) -> List[Document]:
+            vector = await self.indexer.embedding_model.aembed_query(query)
+            return await self.indexer.vector_store.asimilarity_search_by_vector(
+                vector, k=k
+            )
+
+        return await asyncio.gather(*(search(query) for query in queries))
+
+    @staticmethod
+    def _format_documents(docs: List[Document]) -> str:
+        """
+        Concatenate retrieved documents into a single context string.
+        """
+        return "\n\n".join(
+            f"Document {i + 1}: \n {doc.page_content}" for i, doc in enumerate(docs)
+        )
 
     def _create_retrieval_tool(self) -> BaseTool:
         """
@@ -35,75 +108,63 @@ class RetrievalAgent:
         """
 
         @tool
-        async def retrieve_document(query: str) -> str:
+        async def retrieve_document(query: Union[str, List[str]]) -> str:
             """
             Retrieve relevant documents from the vector store based on the query.
 
+            Pass several alternative phrasings as a list to search them all at once.
+
             Args:
-                query (str): The search query to find relevant documents
+                query (Union[str, List[str]]): The search query, or a list of queries,
+                    to find relevant documents
 
             Returns:
                 str: Concatenated content from relevant documents
             """
             logger.debug(f"Retrieving document for query: {query}")
-            if not self.indexer.vector_store:
-                raise ValueError("Vector store is not initialized")
 
-            retriever = self.indexer.vector_store.as_retriever(
-                search_type="similarity",
-                search_kwargs={"k": 5},
-            )
+            if isinstance(query, str):
+                docs = (await self._search([query]))[0]
+                if not docs:
+                    logger.debug("No documents found for the query")
+                    return "No documents found."
 
-            docs = await retriever.ainvoke(query)
-            if not docs:
-                logger.debug("No documents found for the query")
-                return "No documents found."
+                logger.debug(f"{len(docs)} documents retrieved.")
+                return self._format_documents(docs)
 
-            logger.debug(f"{len(docs)} documents retrieved.")
-            context = "\n\n".join([
-                f"Document {i + 1}: \n {doc.page_content}" for i, doc in enumerate(docs)
-            ])
-            return context
+            # Embed and search all reformulations concurrently
+            results = await self._search(query)
+            logger.debug(f"{sum(map(len, results))} documents retrieved.")
+            sections = [
+                f"Results for '{q}':\n{self._format_documents(docs) if docs else 'No documents found.'}"
+                for q, docs in zip(query, results)
+            ]
+            return "\n\n".join(sections)
 
         return retrieve_document
 
-    async def create_retrieval_agent(self, memory: MemoryService):
+    async def create_retrieval_agent(self, memory: Optional[MemoryService] = None):
         """
         Create a ReAct agent specialized in document retrieval.
 
         Args:
-            memory (MemoryService): Service for maintaining conversation context
+            memory (Optional[MemoryService]): Service for maintaining conversation context.
+                When omitted the agent is compiled without a checkpointer so it can run
+                as a sub-graph and inherit the parent graph's checkpointer.
 
         Returns:
             A ReAct agent configured for document retrieval
         """
-        retrieval_prompt = """
-You are a specialized document retrieval assistant. Your task is to find information from a knowledge base.
-Use the retrieved content to answer the user's question. If the user's question is answered without information from the document, answer directly.
-
-**FOLLOW THESE STEPS FOR EACH QUERY:**
-    1. Analyze the query to identify key concepts and information needs.
-    2. If the query is a general greeting (e.g., "hi", "hello", "how are you?"), respond directly without retrieving documents.
-    3. Otherwise, use the `retrieve_document` tool with precise search terms.
-    4. Present the most relevant informants.
-    5. If information is not found, clearly state this limitation from retrieved documetion.
-
-**IMPORTANT**:
-- Base your responses ONLY on the retrieved documents when applicable. Do not invent or assume information.
-- Clearly distinguish between direct information from documents and any necessary inferences.
-- Respond to simple greetings or small talk directly without document retrieval.
-"""
-
         agent_memory = None
         if memory:
             agent_memory = await memory.get_memory_saver()
-        if not agent_memory:
-            logger.error("Agent memory is not initialized")
-            raise ValueError("Agent memory is not initialized.")
+            if not agent_memory:
+                logger.error("Agent memory is not initialized")
+                raise ValueError("Agent memory is not initialized.")
 
         return create_react_agent(
             model=self.llm,
             tools=self.tools,
-            prompt=retrieval_prompt,
+            prompt=_RETRIEVAL_PROMPT,
             checkpointer=agent_memory,
         )
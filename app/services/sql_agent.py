@@ -1,11 +1,232 @@
+import asyncio
+import json
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
 from langchain_community.agent_toolkits.sql.toolkit import SQLDatabaseToolkit
 from langchain_community.utilities.sql_database import SQLDatabase
+from langchain_core.embeddings import Embeddings
+from langchain_core.messages import HumanMessage
+from sqlalchemy import MetaData, create_engine, text
+from sqlalchemy.types import NullType
 
 from app.core.config import settings
+from app.services.answer_cache import SemanticAnswerCache
 from app.services.memory import MemoryService
 from app.services.react_agent import create_react_agent
 from app.utils.logger import logger
 
+# Connection pool for the SQL tools. Tool calls of one step run concurrently in
+# worker threads, each holding a connection while its query runs. Sessions are
+# read-only with a statement timeout, so a generated query can neither modify
+# data nor hold a connection for minutes.
+_ENGINE_ARGS = {
+    "pool_size": 10,
+    "max_overflow": 20,
+    "pool_pre_ping": True,
+    "pool_recycle": 1800,
+    "connect_args": {
+        "options": (
+            f"-c statement_timeout={settings.sql_statement_timeout_ms} "
+            "-c default_transaction_read_only=on"
+        )
+    },
+}
+
+# Sent on every ReAct step, so kept terse: each rule once, no filler prose
+_SQL_PROMPT = """
+You are an expert FinOps agent for cloud cost analysis, optimization and forecasting. Retrieve and analyze cloud cost and usage data, find savings and apply FinOps best practices.
+
+Tools:
+- `sql_db_list_tables`: list tables.
+- `sql_db_schema`: get table schemas.
+- `sql_db_query`: run a query.
+Rules:
+1. Follow each tool's schema exactly with all required parameters. Only call tools listed above, and only when needed; answer general questions directly.
+2. Double-quote column names (e.g. "column_name"). Select only needed columns, never `SELECT *`; filter to limit scanned data; use LIMIT only to cap row listings, sized to the question, never on aggregations.
+3. Cost: always use "blendedCost" from the cost table. Filter by date only if the user gives one. Group by "productCode" rather than "serviceCode" when the table has it.
+4. Never mention tool names, table names or schemas to the user. On errors or missing data, don't show the error; say what data would be needed.
+
+Answer with a high-level overview: key trends, cost drivers and anomalies, then specific quantitative recommendations with estimated savings and the calculations behind them, following industry standards and FinOps principles. Prefer tables to lists. Be clear and concise.
+"""
+
+# Appended to _SQL_PROMPT when the schema summary is small enough to send on
+# every step, saving the list_tables and schema round-trips at the start of
+# most questions
+_SCHEMA_PROMPT = """
+Database schema (table(column type, PK = primary key, FK = foreign key)):
+<schema>
+{schema}
+</schema>
+This lists every table; only call `sql_db_list_tables` or `sql_db_schema` if it is insufficient.
+"""
+
+# Larger schemas are left to the tools rather than inflating every prompt
+_MAX_SCHEMA_SUMMARY_CHARS = 8000
+
+# Distinct table selections whose schema text is kept by _AgentSQLDatabase
+_MAX_TABLE_INFO_ENTRIES = 256
+
+# Rows of a query result returned to the model; the rest are never fetched
+_MAX_QUERY_ROWS = 50
+
+# Reflected metadata per connection string, with the monotonic time it was
+# reflected, reused by _load_database
+_SCHEMA_CACHE: Dict[str, Tuple[float, MetaData]] = {}
+
+
+class _AgentSQLDatabase(SQLDatabase):
+    """
+    SQLDatabase tuned for the agent's tools.
+
+    Table descriptions are reused for settings.schema_cache_ttl seconds. Each
+    includes sample rows, so sql_db_schema costs a query per table, and agents
+    ask for the same tables in most sessions; the text is cached per table
+    selection. Table listing is already served from memory.
+
+    Query results are cut to _MAX_QUERY_ROWS rows, read through a server-side
+    cursor so the rest of a large result is not transferred.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._table_info: Dict[Optional[Tuple[str, ...]], Tuple[float, str]] = {}
+        # Whether the last query in this thread had more rows than returned.
+        # Tool calls run concurrently in worker threads.
+        self._query_state = threading.local()
+
+    def get_table_info(self, table_names: Optional[List[str]] = None) -> str:
+        # Output follows the metadata's table order, not the argument's
+        key = None if table_names is None else tuple(sorted(set(table_names)))
+        now = time.monotonic()
+        cached = self._table_info.get(key)
+        if cached and now - cached[0] < settings.schema_cache_ttl:
+            return cached[1]
+
+        info = super().get_table_info(table_names)
+        if len(self._table_info) >= _MAX_TABLE_INFO_ENTRIES:
+            self._table_info.clear()
+        self._table_info[key] = (now, info)
+        return info
+
+    def _execute(
+        self,
+        command: Any,
+        fetch: str = "all",
+        *,
+        parameters: Optional[Dict[str, Any]] = None,
+        execution_options: Optional[Dict[str, Any]] = None,
+    ) -> Any:
+        self._query_state.truncated = False
+        # A schema needs the dialect-specific setup in the base class
+        if fetch != "all" or self._schema is not None:
+            return super()._execute(
+                command,
+                fetch,
+                parameters=parameters,
+                execution_options=execution_options,
+            )
+
+        options = dict(execution_options or {})
+        if isinstance(command, str):
+            # Server-side cursors only accept queries
+            if command.lstrip().lower().startswith(("select", "with")):
+                options["stream_results"] = True
+            command = text(command)
+        with self._engine.begin() as connection:
+            cursor = connection.execute(
+                command, parameters or {}, execution_options=options
+            )
+            if not cursor.returns_rows:
+                return []
+            rows = cursor.fetchmany(_MAX_QUERY_ROWS + 1)
+            cursor.close()
+
+        self._query_state.truncated = len(rows) > _MAX_QUERY_ROWS
+        return [row._asdict() for row in rows[:_MAX_QUERY_ROWS]]
+
+    def run(self, command: Any, fetch: str = "all", *args, **kwargs) -> Any:
+        result = super().run(command, fetch, *args, **kwargs)
+        if fetch == "all" and getattr(self._query_state, "truncated", False):
+            result += (
+                f"\n(Only the first {_MAX_QUERY_ROWS} rows are shown; "
+                "aggregate or filter the query to cover the rest.)"
+            )
+        return result
+
+
+def _load_database(uri: str) -> _AgentSQLDatabase:
+    """
+    Create the SQLDatabase, reusing table metadata reflected earlier in this process.
+
+    Reflecting every table is the slow part of SQLDatabase.from_uri, so the
+    reflected MetaData is kept in memory, keyed by the connection string.
+    Metadata younger than settings.schema_cache_ttl is reused, and tables
+    missing from it are reflected when first used. It is never written to
+    disk, where loading it would mean trusting whatever file is found there.
+
+    Args:
+        uri: Database connection string
+
+    Returns:
+        _AgentSQLDatabase: Database wrapper for the SQL toolkit
+    """
+    cached = _SCHEMA_CACHE.get(uri)
+    if cached and time.monotonic() - cached[0] < settings.schema_cache_ttl:
+        logger.debug("Reusing reflected database schema")
+        return _AgentSQLDatabase(
+            create_engine(uri, **_ENGINE_ARGS),
+            metadata=cached[1],
+            lazy_table_reflection=True,
+        )
+
+    db = _AgentSQLDatabase.from_uri(uri, engine_args=_ENGINE_ARGS)
+    _SCHEMA_CACHE[uri] = (time.monotonic(), db._metadata)
+    return db
+
+
+def _schema_summary(db: SQLDatabase) -> str:
+    """
+    Describe the usable tables compactly, one line per table.
+
+    Lists each column's name and type with primary and foreign keys marked.
+    Columns whose type could not be reflected are left out, as
+    SQLDatabase.get_table_info does.
+
+    Args:
+        db: Database whose reflected metadata is described
+
+    Returns:
+        str: Schema summary
+    """
+    usable = set(db.get_usable_table_names())
+    dialect = db._engine.dialect
+    lines = []
+    for table in db._metadata.sorted_tables:
+        if table.name not in usable:
+            continue
+        columns = []
+        for column in table.columns:
+            if isinstance(column.type, NullType):
+                continue
+            spec = f'"{column.name}" {column.type.compile(dialect)}'
+            if column.primary_key:
+                spec += " PK"
+            for fk in column.foreign_keys:
+                spec += f" FK {fk.target_fullname}"
+            columns.append(spec)
+        lines.append(f"{table.name}({', '.join(columns)})")
+    return "\n".join(lines)
+
+
+# Asks for all answers of a batch in one reply, parsed by SqlAgent.abatch_ask
+_BATCH_PROMPT = """
+Answer each of the following questions. Reply with only a JSON object mapping "A1" to "A{count}" to the answers of Q1 to Q{count}, each answer a string.
+
+{questions}
+"""
+
 
 class SqlAgent:
     """
@@ -13,76 +234,147 @@ class SqlAgent:
     Handles database queries using ReAct framework.
     """
 
-    def __init__(self):
+    def __init__(self, embedding_model: Optional[Embeddings] = None):
         """
-        Initialize SQL Agent with database connection and tools.
+        Initialize SQL Agent. The database connection and tools are set up by ainit.
+
+        Args:
+            embedding_model (Optional[Embeddings]): Model for embedding questions.
+                When given and settings.answer_cache_enabled is set, answers are
+                cached and reused for similar questions.
         """
         self.llm = settings.llm
-        self.db = SQLDatabase.from_uri(settings.database)
+        self.answer_cache = (
+            SemanticAnswerCache(
+                embedding_model,
+                threshold=settings.answer_cache_threshold,
+                ttl=settings.answer_cache_ttl,
+            )
+            if embedding_model and settings.answer_cache_enabled
+            else None
+        )
+        # Set by ainit, which connects to the database
+        self.db: Optional[SQLDatabase] = None
+        self.sql_toolkit: Optional[SQLDatabaseToolkit] = None
+        self.sql_tools = []
+        self.prompt = _SQL_PROMPT
+
+    async def ainit(self):
+        """
+        Connect to the database and build the SQL tools and prompt.
+
+        Creating the SQLDatabase reflects the schema, which is blocking
+        database I/O, so it runs in a worker thread.
+        """
+        if self.db is not None:
+            return
+
+        self.db = await asyncio.to_thread(_load_database, settings.database)
         self.sql_toolkit = SQLDatabaseToolkit(db=self.db, llm=self.llm)
         self.sql_tools = self.sql_toolkit.get_tools()
+        self.prompt = self._build_prompt()
+
+    async def aclose(self):
+        """
+        Dispose of the database engine, closing its pooled connections.
+        This should be called once during application shutdown
+        """
+        if self.db is not None:
+            await asyncio.to_thread(self.db._engine.dispose)
+            self.db = None
+            logger.debug("SQL agent database engine disposed.")
+
+    def _build_prompt(self) -> str:
+        """
+        Build the system prompt, embedding the schema summary when it is small.
+
+        Returns:
+            str: System prompt for the SQL agent
+        """
+        try:
+            schema = _schema_summary(self.db)
+        except Exception as e:
+            logger.warning(f"Failed to summarize database schema: {e}")
+            return _SQL_PROMPT
+
+        if not schema or len(schema) > _MAX_SCHEMA_SUMMARY_CHARS:
+            logger.debug("Schema summary not embedded in the SQL prompt")
+            return _SQL_PROMPT
+        return _SQL_PROMPT + _SCHEMA_PROMPT.replace("{schema}", schema)
 
-    async def create_sql_agent(self, memory: MemoryService):
+    async def create_sql_agent(self, memory: Optional[MemoryService] = None):
         """
         Create a ReAct agent specialized in SQL queries.
 
         Args:
-            memory (MemoryService): Service for maintaining conversation context
+            memory (Optional[MemoryService]): Service for maintaining conversation context.
+                When omitted the agent is compiled without a checkpointer so it can run
+                as a sub-graph and inherit the parent graph's checkpointer.
 
         Returns:
             A ReAct agent configured for SQL operations
         """
-        sql_prompt = """
-             You are a Expert FinOps Agent specializing in cloud cost analysis, optimization,cloud cost foreasting, and actionable financial insights.
-             Your mission is to help users retrieve, analyze, and optimize cloud cost and usage data while identifying cost-saving opportunities and ensuring adherence to FinOps best practices.
-
-             <tool_calling>You have folowing tools at your disposal to analyze and answer the user question. Follow these rules regarding tool call
-             - `sql_db_list_tables` use this tool to identify all the tables.
-             - `sql_db_schema` Use this tool to understand the schema of the tables.
-             - `sql_db_query` Use this tool to execute the query and get the response.
-             1.ALWAYS follow tool call schema exactly as specified and make sure to provide all necessary parameters. select only necessary columns.
-             2.The conversation may reference tools that are no longer avilable. NEVER call tools that are not explicitly provided.
-             3.Only calls tools when they are necessary. If the USER's task is general or you already know the answer, just respond without calling tools.
-             4.Always enclose column names in double quotes (e.g., `"column_name"`) to avoid conflicts with reserved keywords.
-             5.NEVER refer to tool_names, table_names when speaking to the USER.
-             </tool_calling>
-
-                When querying database, focus on:
-                - When calculating cost ALWAYS use `blendedCost` column from cost table for cost calculations.
-                - When querying databse don't consider dates untill and unless user give a specific date.
-                - When grouping prefer `productCode` over `serviceCode` if `productCode` avilable in tableschema.
-
-                When responding, focus on:
-                - **IMPORTANT** Don't respond the table names and the schema back to the user.
-                - Summarize cost and usage trends, pinpoint anomalies, and provide specific, quantitative recommendations for cost optimization.
-                - Prefer to respond in table rarther than list.
-                - Providing a high-level overview of the analysis, including key trends, cost drivers, and specific, quantitative recommendations for cost optimization.
-                - Consider industry standards for improving cloud cost management and operational efficiency.
-                - Including estimated savings or efficiency gains with supporting calculations.
-                - Ensure your explanations are clear, concise, and directly aligned with FinOps principles.
-
-             **Additional Guidelines:**
-             - **Error Handling:**
-               - Gracefully handle errors and give appropriate response to users, don't sent the error to the user.
-               - If the required data is not available, inform the user about what additional data would be needed to perform the analysis.
-
-             - **Performance Considerations:**
-               - Optimize queries to reduce data scan size by leveraging appropriate filters, indexes, and efficient querying techniques.
-               - Use LIMIT statement only when necessary, if the user question requires more data to calulate provide the limit based on the question.(Don't use `SELECT *` in querries).
-
-             Your responses should always strive for clarity and provide actionable, quantitative recommendations that empower users to achieve better cloud cost management and efficiency.
-             """
+        await self.ainit()
 
         agent_memory = None
         if memory:
             agent_memory = await memory.get_memory_saver()
-        if not agent_memory:
-            logger.error("Agent memory is not initialized")
-            raise ValueError("Agent memory is not initialized.")
+            if not agent_memory:
+                logger.error("Agent memory is not initialized")
+                raise ValueError("Agent memory is not initialized.")
 
         return create_react_agent(
             model=self.llm,
             tools=self.sql_tools,
-            prompt=sql_prompt,
+            prompt=self.prompt,
             checkpointer=agent_memory,
+            answer_cache=self.answer_cache,
         )
+
+    async def abatch_ask(self, questions: List[str]) -> List[str]:
+        """
+        Answer several independent questions with a single agent run.
+
+        The questions are numbered in one message, so the system prompt and
+        schema are processed once and tool results are shared, instead of a
+        separate ReAct loop per question. The run bypasses the answer cache,
+        whose entries must answer a single question.
+
+        Args:
+            questions (List[str]): Questions to answer
+
+        Returns:
+            List[str]: Answer to each question, in order
+
+        Raises:
+            ValueError: If the agent's reply is not the expected JSON object
+        """
+        if not questions:
+            return []
+
+        await self.ainit()
+        agent = create_react_agent(
+            model=self.llm,
+            tools=self.sql_tools,
+            prompt=self.prompt,
+            answer_cache=None,
+        )
+        content = _BATCH_PROMPT.format(
+            count=len(questions),
+            questions="\n".join(f"Q{i}: {q}" for i, q in enumerate(questions, 1)),
+        )
+        # Leave room for a few tool calls per question
+        result = await agent.ainvoke(
+            {"messages": [HumanMessage(content=content)]},
+            {"recursion_limit": max(25, 10 * len(questions))},
+        )
+
+        reply = result["messages"][-1].content
+        try:
+            answers = json.loads(reply[reply.index("{") : reply.rindex("}") + 1])
+            if not isinstance(answers, dict):
+                raise ValueError("reply is not a JSON object")
+        except ValueError as e:
+            logger.error(f"Failed to parse batch answers: {e}")
+            raise ValueError("SQL agent did not return answers as JSON.") from e
+        return [str(answers.get(f"A{i}", "")) for i in range(1, len(questions) + 1)]
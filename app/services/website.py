@@ -11,17 +11,92 @@ proper validation, error handling, and deduplication of website processing.
 
 import asyncio
 import xml.etree.ElementTree as ET
-from typing import Any, Dict, List, Optional
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
 from urllib.parse import urljoin
 
 import httpx
-from langchain_community.document_loaders import WebBaseLoader
+from langchain_core.documents import Document
 from pydantic import HttpUrl
-
+from selectolax.lexbor import LexborHTMLParser
+from tenacity import (
+    retry,
+    retry_if_exception,
+    stop_after_attempt,
+    wait_exponential_jitter,
+)
+
+from app.core.config import settings
 from app.services.database import DatabaseService
-from app.services.indexer import IndexerService
+from app.services.indexer import IndexerService, unseen_chunks
 from app.utils.logger import logger
 
+_SITEMAP_NS = "{http://www.sitemaps.org/schemas/sitemap/0.9}"
+_SITEMAP_LOC_TAG = f"{_SITEMAP_NS}loc"
+# Entries of a page sitemap (<urlset>) and of a sitemap index (<sitemapindex>)
+_SITEMAP_URL_TAG = f"{_SITEMAP_NS}url"
+_SITEMAP_INDEX_TAG = f"{_SITEMAP_NS}sitemap"
+# Leading bytes of a gzip stream, for sitemaps served as .xml.gz files
+_GZIP_MAGIC = b"\x1f\x8b"
+
+# Sitemap entries for binary assets, which have no text worth indexing
+_SKIP_EXTENSIONS = (".pdf", ".zip", ".mp4", ".png", ".jpg", ".jpeg", ".gif", ".svg")
+
+# Elements whose text isn't page content, removed before extraction
+_NON_CONTENT_TAGS = ["script", "style", "noscript", "nav", "footer"]
+
+# Statuses worth retrying: rate limiting and server-side failures
+_TRANSIENT_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+def _is_transient(error: BaseException) -> bool:
+    """
+    Whether a failed request is worth retrying.
+    """
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code in _TRANSIENT_STATUSES
+    return isinstance(error, httpx.TransportError)
+
+
+# Retry requests on transient network and server errors, backing off with
+# jitter so concurrent retries don't arrive together
+_retry_transient = retry(
+    retry=retry_if_exception(_is_transient),
+    stop=stop_after_attempt(3),
+    wait=wait_exponential_jitter(initial=1, max=8),
+    reraise=True,
+)
+
+
+def _html_to_document(url: str, html: str) -> Document:
+    """
+    Extract the visible text and metadata of a web page.
+
+    Parsed with selectolax's lexbor backend, which is several times faster
+    than BeautifulSoup. Scripts, styles and navigation chrome are dropped
+    before the text is taken.
+
+    Args:
+        url: URL the page was fetched from
+        html: Page content
+
+    Returns:
+        Document: Page text with source, title, description and language metadata
+    """
+    tree = LexborHTMLParser(html)
+    metadata = {"source": url}
+    if title := tree.css_first("title"):
+        metadata["title"] = title.text()
+    if description := tree.css_first('meta[name="description"]'):
+        metadata["description"] = description.attributes.get(
+            "content", "No description found."
+        )
+    if html_tag := tree.css_first("html"):
+        metadata["language"] = html_tag.attributes.get("lang", "No language found.")
+    tree.strip_tags(_NON_CONTENT_TAGS)
+    text = tree.body.text(separator="\n", strip=True) if tree.body else ""
+    return Document(page_content=text, metadata=metadata)
+
 
 class WebsiteService:
     """
@@ -52,12 +127,33 @@ class WebsiteService:
         """
         self.indexer = indexer
         self.database = database
+        # Shared by all requests so connections to a site are kept alive and
+        # reused instead of opening a new TLS connection per page
+        self._client = httpx.AsyncClient(
+            timeout=httpx.Timeout(30.0, connect=5.0),
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=50),
+        )
+        # Bounds pages in flight across all crawls, so a large sitemap runs as
+        # a steady pipeline rather than opening a request per URL at once
+        self._semaphore = asyncio.Semaphore(settings.crawl_concurrency)
         logger.debug("Website service initialized")
 
+    async def aclose(self):
+        """
+        Close the HTTP client, releasing its pooled connections.
+        This should be called once during application shutdown
+        """
+        await self._client.aclose()
+        logger.debug("Website HTTP client closed.")
+
     async def _fetch_sitemap(self, base_url: HttpUrl) -> List[str]:
         """
         Fetch and parse the website's sitemap.xml to discover URLs.
 
+        If the sitemap is a sitemap index, the sitemaps it lists are fetched
+        concurrently, level by level, and their URLs combined.
+
         Args:
             base_url: Base URL of the website
 
@@ -72,20 +168,27 @@ class WebsiteService:
         sitemap_url = urljoin(str(base_url), "sitemap.xml")
 
         try:
-            # Use a timeout to prevent hanging on slow websites
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.get(sitemap_url)
-                response.raise_for_status()
-
-            # Parse the XML sitemap
-            root = ET.fromstring(response.content)
-            urls = [
-                loc.text
-                for loc in root.findall(
-                    ".//{http://www.sitemaps.org/schemas/sitemap/0.9}loc"
+            pages, sitemaps = await self._read_sitemap(sitemap_url)
+            urls = dict.fromkeys(pages)
+            seen = {sitemap_url}
+            while sitemaps:
+                sitemaps = [u for u in dict.fromkeys(sitemaps) if u not in seen]
+                seen.update(sitemaps)
+                results = await asyncio.gather(
+                    *(self._read_sitemap(u) for u in sitemaps), return_exceptions=True
                 )
-                if loc.text and not loc.text.endswith(".pdf")
-            ]
+                children = []
+                for child_url, result in zip(sitemaps, results):
+                    if isinstance(result, Exception):
+                        logger.warning(
+                            f"Failed to fetch sitemap {child_url}: {str(result)}"
+                        )
+                        continue
+                    child_pages, child_sitemaps = result
+                    urls.update(dict.fromkeys(child_pages))
+                    children.extend(child_sitemaps)
+                sitemaps = children
+            urls = list(urls)
 
             if not urls:
                 logger.warning(f"No valid URLs found in sitemap for {base_url}")
@@ -113,48 +216,162 @@ class WebsiteService:
             )
             return [str(base_url)]
 
-    async def _process_url(self, url: str) -> Optional[int]:
+    @_retry_transient
+    async def _read_sitemap(self, sitemap_url: str) -> Tuple[List[str], List[str]]:
         """
-        Process a single URL, extracting content and adding to vector store.
+        Download and parse a sitemap, retrying transient failures.
+
+        The sitemap is parsed as it downloads, clearing each entry once read,
+        so neither the whole body nor the whole tree is held. The client asks
+        for a compressed transfer and decodes it; sitemaps stored as gzip
+        files are decompressed here as they stream in. The client's timeout
+        prevents hanging on slow websites.
+
+        Args:
+            sitemap_url: URL of the sitemap
+
+        Returns:
+            Tuple[List[str], List[str]]: Page URLs listed in the sitemap,
+                without duplicates, and the sitemaps it lists if it is an index
+        """
+        # Keyed by URL so repeated entries are dropped as they are parsed,
+        # keeping the order of first appearance
+        urls: Dict[str, None] = {}
+        sitemaps: List[str] = []
+        parser = ET.XMLPullParser(["end"])
+        decompressor = None
+        first = True
+        async with self._client.stream("GET", sitemap_url) as response:
+            response.raise_for_status()
+            async for data in response.aiter_bytes(1 << 16):
+                if first and data.startswith(_GZIP_MAGIC):
+                    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+                first = False
+                if decompressor is not None:
+                    data = decompressor.decompress(data)
+                parser.feed(data)
+                self._collect_sitemap_urls(parser, urls, sitemaps)
+        parser.close()
+        self._collect_sitemap_urls(parser, urls, sitemaps)
+        return list(urls), sitemaps
+
+    @_retry_transient
+    async def _get_page(self, url: str) -> str:
+        """
+        Download a page's HTML, retrying transient failures.
+
+        Args:
+            url: URL of the page
+
+        Returns:
+            str: The page's decoded body
+        """
+        # Acquired per attempt, so a request waiting to be retried doesn't
+        # hold a slot
+        async with self._semaphore:
+            response = await self._client.get(url)
+            response.raise_for_status()
+            return response.text
+
+    @staticmethod
+    def _collect_sitemap_urls(
+        parser: ET.XMLPullParser, urls: Dict[str, None], sitemaps: List[str]
+    ) -> None:
+        """
+        Add the URLs parsed so far from a sitemap, skipping binary assets.
+
+        Args:
+            parser: Pull parser fed with sitemap data
+            urls: Ordered page URLs found so far, which new URLs are added to
+            sitemaps: Sitemaps listed by a sitemap index, appended to
+        """
+        for _, elem in parser.read_events():
+            if elem.tag not in (_SITEMAP_URL_TAG, _SITEMAP_INDEX_TAG):
+                continue
+            loc = (elem.findtext(_SITEMAP_LOC_TAG) or "").strip()
+            if loc and elem.tag == _SITEMAP_INDEX_TAG:
+                sitemaps.append(loc)
+            elif loc and not loc.endswith(_SKIP_EXTENSIONS):
+                urls[loc] = None
+            elem.clear()
+
+    async def _process_url(self, url: str) -> Optional[List[Document]]:
+        """
+        Process a single URL, extracting and splitting its content.
 
         Args:
             url: URL to process
 
         Returns:
-            Optional[int]: Number of chunks added to vector store, or None if failed
+            Optional[List[Document]]: Chunks of the page's content, or None if failed
         """
         logger.debug(f"Processing URL: {url}")
         try:
-            # Load content from the URL
-            loader = WebBaseLoader(str(url))
-            docs = loader.load()
+            # Load content from the URL, parsing the page off the event loop
+            html = await self._get_page(str(url))
+            doc = await asyncio.to_thread(_html_to_document, str(url), html)
 
-            if not docs:
+            if not doc.page_content.strip():
                 logger.warning(f"No content found at URL: {url}")
                 return None
+            docs = [doc]
 
             # Split content into chunks for indexing
-            chunks = self.indexer.text_splitter.split_documents(docs)
+            chunks = await asyncio.to_thread(
+                self.indexer.text_splitter.split_documents, docs
+            )
             if not chunks:
                 logger.warning(f"No chunks generated for URL: {url}")
                 return None
 
-            # Add chunks to vector store
-            logger.debug(
-                f"Adding {len(chunks)} chunks from URL: {url} to vector database"
-            )
-            self.indexer.vector_store.add_documents(chunks)
-
-            # Record website as processed in database
-            self.database.add_website(url)
             logger.debug(f"Successfully processed URL: {url} with {len(chunks)} chunks")
-
-            return len(chunks)
+            return chunks
 
         except Exception as e:
             logger.error(f"Error processing URL {url}: {str(e)}")
             return None
 
+    async def _index_pages(self, page_chunks: List[Tuple[str, List[Document]]]) -> bool:
+        """
+        Embed and store the chunks of several pages, then record the pages.
+
+        Chunks are stored under their content hash, so pages indexed again
+        after a partial write don't leave duplicates.
+
+        Args:
+            page_chunks: URL and chunks of each page to index
+
+        Returns:
+            bool: True if the pages were indexed, False if indexing failed
+        """
+        if not page_chunks:
+            return True
+
+        chunks = [chunk for _, page in page_chunks for chunk in page]
+        try:
+            # Only embed chunks whose text hasn't been indexed before
+            new_chunks = await asyncio.to_thread(unseen_chunks, chunks, self.database)
+            await self.indexer.aadd_documents(
+                list(new_chunks.values()), ids=list(new_chunks)
+            )
+            await asyncio.to_thread(
+                self.database.add_chunk_hashes,
+                [
+                    (chunk_hash, chunk.metadata["source"], chunk_hash)
+                    for chunk_hash, chunk in new_chunks.items()
+                ],
+            )
+            await asyncio.to_thread(
+                self.database.add_websites_batch, [url for url, _ in page_chunks]
+            )
+            logger.debug(
+                f"Indexed {len(new_chunks)} of {len(chunks)} chunks from {len(page_chunks)} pages"
+            )
+            return True
+        except Exception as e:
+            logger.error(f"Error indexing {len(page_chunks)} pages: {str(e)}")
+            return False
+
     async def process_website(self, url: HttpUrl) -> Dict[str, Any]:
         """
         Process an entire website, starting from a base URL.
@@ -170,15 +387,67 @@ class WebsiteService:
         try:
             # Discover URLs from sitemap
             urls = await self._fetch_sitemap(url)
+
+            # Skip pages recorded by an earlier run before fetching anything
+            known = await self.database.aexisting_websites(urls)
+            if known:
+                urls = [page_url for page_url in urls if page_url not in known]
+                logger.debug(f"Skipping {len(known)} already processed URLs")
             logger.debug(f"Found {len(urls)} URLs to process for website: {url}")
 
-            # Process all URLs concurrently
-            tasks = [self._process_url(url) for url in urls]
-            results = await asyncio.gather(*tasks)
+            # Crawled pages are handed to a single indexing consumer in
+            # bounded batches, so embedding starts while the crawl runs and a
+            # failed batch only loses its own pages
+            queue: asyncio.Queue[Optional[Tuple[str, List[Document]]]] = asyncio.Queue()
+            # Chunks per indexing call: one full round of concurrent
+            # embedding requests
+            flush_size = settings.embedding_batch_size * settings.embedding_concurrency
+
+            async def produce(page_url: str) -> None:
+                """Crawl and split a page, queueing its chunks."""
+                chunks = await self._process_url(page_url)
+                if chunks is not None:
+                    await queue.put((page_url, chunks))
+
+            async def consume() -> Tuple[List[str], List[str], int]:
+                """Index queued pages in batches until the end marker."""
+                indexed: List[str] = []
+                failed: List[str] = []
+                total_chunks = 0
+                batch: List[Tuple[str, List[Document]]] = []
+                batch_chunks = 0
+                while True:
+                    item = await queue.get()
+                    if item is not None:
+                        batch.append(item)
+                        batch_chunks += len(item[1])
+                        if batch_chunks < flush_size:
+                            continue
+                    ok = await self._index_pages(batch)
+                    (indexed if ok else failed).extend(page for page, _ in batch)
+                    total_chunks += batch_chunks
+                    batch, batch_chunks = [], 0
+                    if item is None:
+                        return indexed, failed, total_chunks
+
+            # Process URLs concurrently, each waiting for a fetch slot
+            consumer = asyncio.create_task(consume())
+            try:
+                await asyncio.gather(*(produce(page_url) for page_url in urls))
+                await queue.put(None)
+                processed, failed, total_chunks = await consumer
+            finally:
+                # If a producer raised or the request was cancelled, the end
+                # marker never arrives; stop the consumer rather than leave
+                # it waiting on the queue forever
+                if not consumer.done():
+                    consumer.cancel()
+                    await asyncio.gather(consumer, return_exceptions=True)
+            if failed:
+                logger.warning(f"Failed to index {len(failed)} pages from {url}")
 
             # Count successfully processed URLs
-            successful_urls = sum(1 for result in results if result is not None)
-            total_chunks = sum(result for result in results if result is not None)
+            successful_urls = len(processed)
 
             logger.debug(
                 f"Completed website processing: {url}, {successful_urls}/{len(urls)} pages processed"
@@ -188,6 +457,8 @@ class WebsiteService:
                 "status": "success",
                 "processed_urls": successful_urls,
                 "total_urls": len(urls),
+                "skipped_urls": len(known),
+                "failed_urls": len(failed),
                 "total_chunks": total_chunks,
                 "message": f"Successfully processed {successful_urls} pages from {url}",
             }
@@ -10,17 +10,87 @@ and ensures proper error handling and deduplication of wiki content processing.
 """
 
 import asyncio
+import hashlib
 import re
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 import aiohttp
+import orjson
 from langchain_core.documents import Document
-
+from tenacity import (
+    RetryCallState,
+    retry,
+    retry_if_exception,
+    stop_after_attempt,
+    wait_exponential_jitter,
+)
+
+from app.core.config import settings
 from app.models.wiki import WikiPage
 from app.services.database import DatabaseService
-from app.services.indexer import IndexerService
+from app.services.indexer import IndexerService, unseen_chunks
 from app.utils.logger import logger
 
+# Markdown image references, removed from page content before indexing
+_MD_IMAGE_RE = re.compile(r"!\[[^\]]*\]\([^\)]*\)")
+
+# Statuses worth retrying: rate limiting and server-side failures
+_TRANSIENT_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+# Bound on a single page request, so one stuck page can't stall the wiki
+_PAGE_TIMEOUT = aiohttp.ClientTimeout(total=30, connect=5)
+
+
+def _is_transient(error: BaseException) -> bool:
+    """
+    Whether a failed page request is worth retrying.
+    """
+    if isinstance(error, aiohttp.ClientResponseError):
+        return error.status in _TRANSIENT_STATUSES
+    return isinstance(error, (aiohttp.ClientError, asyncio.TimeoutError))
+
+
+# Longest server-requested delay honored before a retry, in seconds
+_MAX_RETRY_AFTER = 60
+
+_backoff = wait_exponential_jitter(initial=1, max=8)
+
+
+def _wait_before_retry(retry_state: RetryCallState) -> float:
+    """
+    Seconds to wait before retrying a page request.
+
+    Uses the Retry-After header Azure DevOps sends when throttling, and
+    exponential backoff with jitter otherwise.
+    """
+    error = retry_state.outcome.exception()
+    if isinstance(error, aiohttp.ClientResponseError) and error.headers:
+        retry_after = error.headers.get("Retry-After", "")
+        if retry_after.isdigit():
+            return min(float(retry_after), _MAX_RETRY_AFTER)
+    return _backoff(retry_state)
+
+
+# Retry page requests on transient network and server errors, backing off
+# with jitter so concurrent retries don't arrive together
+_retry_transient = retry(
+    retry=retry_if_exception(_is_transient),
+    stop=stop_after_attempt(3),
+    wait=_wait_before_retry,
+    reraise=True,
+)
+
+# Statuses the embedding endpoint returns for a request that is too large or
+# has unacceptable input, which splitting the batch can isolate
+_PAYLOAD_STATUSES = frozenset({400, 413})
+
+
+def _is_payload_error(error: BaseException) -> bool:
+    """
+    Whether a failed indexing call was rejected for what it sent.
+    """
+    return getattr(error, "status_code", None) in _PAYLOAD_STATUSES
+
 
 class WikiService:
     """
@@ -38,6 +108,14 @@ class WikiService:
     DatabaseService for tracking processed wikis.
     """
 
+    # HTTP session shared by all instances, which are created per request,
+    # so connections and TLS sessions to Azure DevOps are reused across wikis
+    _session: Optional[aiohttp.ClientSession] = None
+
+    # Bounds requests in flight to Azure DevOps across all wikis, so
+    # concurrent fetches stay under its rate limits
+    _semaphore: Optional[asyncio.Semaphore] = None
+
     def __init__(
         self,
         organization: str,
@@ -69,6 +147,50 @@ class WikiService:
         self.api_version = "7.1"
         logger.debug(f"Wiki service initialized for wiki: {wiki_identifier}")
 
+    @classmethod
+    def _get_session(cls) -> aiohttp.ClientSession:
+        """
+        Return the shared HTTP session, creating it on first use.
+
+        Created lazily because an aiohttp session must be made inside the
+        running event loop.
+        """
+        if cls._session is None or cls._session.closed:
+            # Error statuses raise ClientResponseError, handled in one place
+            # by each caller instead of branching on the status everywhere
+            cls._session = aiohttp.ClientSession(
+                raise_for_status=True,
+                connector=aiohttp.TCPConnector(
+                    limit=100,
+                    limit_per_host=30,
+                    ttl_dns_cache=300,
+                    keepalive_timeout=60,
+                ),
+            )
+        return cls._session
+
+    @classmethod
+    def _get_semaphore(cls) -> asyncio.Semaphore:
+        """
+        Return the shared request limit, creating it on first use.
+
+        Created lazily, like the session, so it isn't made at import time
+        outside the event loop that uses it.
+        """
+        if cls._semaphore is None:
+            cls._semaphore = asyncio.Semaphore(settings.crawl_concurrency)
+        return cls._semaphore
+
+    @classmethod
+    async def aclose(cls) -> None:
+        """
+        Close the shared HTTP session and reset the request limit.
+        """
+        if cls._session is not None:
+            await cls._session.close()
+            cls._session = None
+        cls._semaphore = None
+
     async def _fetch_wiki_pages(self) -> Optional[List[WikiPage]]:
         """
         Fetch all wiki pages from Azure DevOps Wiki.
@@ -81,32 +203,36 @@ class WikiService:
         """
         logger.debug(f"Fetching wiki pages for {self.wiki_identifier}")
         try:
-            async with aiohttp.ClientSession(auth=self.auth) as session:
-                # Get the root page first with recursive retrieval
-                params = {
-                    "path": "/",
-                    "recursionLevel": "full",
-                    "includeContent": "true",
-                    "api-version": self.api_version,
-                }
-
-                # Define timeout to prevent hanging on large wikis
-                timeout = aiohttp.ClientTimeout(total=300)  # 5-minute timeout
-                async with session.get(
-                    self.base_url, params=params, timeout=timeout
-                ) as response:
-                    if response.status == 200:
-                        wiki_tree = await response.json()
-                        pages = await self._process_wiki_tree(wiki_tree, session)
-                        logger.info(f"Successfully fetched {len(pages)} wiki pages")
-                        return pages
-                    else:
-                        response_text = await response.text()
-                        logger.error(
-                            f"Failed to fetch wiki pages. Status: {response.status}, Response: {response_text[:200]}"
-                        )
-                        return None
+            session = self._get_session()
+            # Get the root page first with recursive retrieval
+            params = {
+                "path": "/",
+                "recursionLevel": "full",
+                "includeContent": "true",
+                "api-version": self.api_version,
+            }
 
+            # Define timeout to prevent hanging on large wikis
+            timeout = aiohttp.ClientTimeout(total=300)  # 5-minute timeout
+            async with (
+                self._get_semaphore(),
+                session.get(
+                    self.base_url, params=params, auth=self.auth, timeout=timeout
+                ) as response,
+            ):
+                # orjson decodes the large recursive tree much faster than
+                # json, and parsing the raw bytes skips the full-size str
+                # copy response.json() decodes first
+                wiki_tree = orjson.loads(await response.read())
+            pages = await self._process_wiki_tree(wiki_tree, session)
+            logger.info(f"Successfully fetched {len(pages)} wiki pages")
+            return pages
+
+        except aiohttp.ClientResponseError as e:
+            logger.error(
+                f"Failed to fetch wiki pages. Status: {e.status}, Reason: {e.message}"
+            )
+            return None
         except aiohttp.ClientError as e:
             logger.error(f"HTTP client error fetching wiki pages: {str(e)}")
             return None
@@ -117,45 +243,100 @@ class WikiService:
             logger.error(f"Error fetching wiki pages: {str(e)}", exc_info=True)
             return None
 
+    @staticmethod
+    def _flatten_tree(root: dict) -> List[dict]:
+        """
+        List the pages of a wiki tree in page order.
+
+        Walked iteratively rather than recursively, so deep wikis don't hit
+        the recursion limit.
+
+        Args:
+            root: Dictionary representing the root wiki page from the API
+
+        Returns:
+            List[dict]: The root page followed by its subpages, depth first
+        """
+        nodes = []
+        stack = [root]
+        while stack:
+            page = stack.pop()
+            nodes.append(page)
+            # Pushed in reverse so subpages are visited in their listed order
+            stack.extend(reversed(page.get("subPages", [])))
+        return nodes
+
     async def _process_wiki_tree(
-        self, page: dict, session: aiohttp.ClientSession
+        self, root: dict, session: aiohttp.ClientSession
     ) -> List[WikiPage]:
         """
-        Process wiki tree and extract pages recursively.
+        Flatten the wiki tree into pages, fetching content missing from the tree.
+
+        Pages whose content field the tree response left out are fetched
+        concurrently, at most settings.crawl_concurrency at a time across
+        all wikis.
 
         Args:
-            page: Dictionary representing a wiki page from the API
+            root: Dictionary representing the root wiki page from the API
             session: Active HTTP session for additional content retrieval
 
         Returns:
             List[WikiPage]: List of wiki pages with content
         """
-        pages = []
-
-        # Extract page data
-        page_path = page.get("path", "/")
-        content = page.get("content", "")
-
-        # Fetch content if not included in the tree response
-        if not content:
-            content = await self._fetch_page_content(page_path, session)
-
-        # Create WikiPage object
-        wiki_page = WikiPage(
-            page_path=page_path,
-            content=content,
-            remote_url=page.get("remoteUrl", ""),
-        )
-        logger.debug(f"Processed wiki page: {wiki_page.page_path}")
-        pages.append(wiki_page)
-
-        # Recursively process subpages
-        for subpage in page.get("subPages", []):
-            subpage_results = await self._process_wiki_tree(subpage, session)
-            pages.extend(subpage_results)
-
+        nodes = self._flatten_tree(root)
+
+        async def page_content(page: dict) -> str:
+            # Fetch content only if the tree response left the field out; a
+            # page returned with empty content is empty, not missing
+            if "content" in page:
+                return page["content"] or ""
+            return await self._fetch_page_content(page.get("path", "/"), session)
+
+        contents = await asyncio.gather(*(page_content(page) for page in nodes))
+
+        pages = [
+            WikiPage(
+                page_path=page.get("path", "/"),
+                content=content,
+                remote_url=page.get("remoteUrl", ""),
+            )
+            for page, content in zip(nodes, contents)
+        ]
+        logger.debug(f"Processed {len(pages)} wiki pages")
         return pages
 
+    @_retry_transient
+    async def _get_page(self, page_path: str, session: aiohttp.ClientSession) -> dict:
+        """
+        Request a single wiki page with its content.
+
+        Args:
+            page_path: Path of the wiki page to fetch
+            session: Active HTTP session for content retrieval
+
+        Returns:
+            dict: The page as returned by the API
+
+        Raises:
+            aiohttp.ClientResponseError: On an error status, after retries if transient
+            aiohttp.ClientError: If the request still fails after retries
+            asyncio.TimeoutError: If the request still times out after retries
+        """
+        params = {
+            "path": page_path,
+            "includeContent": "true",
+            "api-version": self.api_version,
+        }
+        # Acquired per attempt, so a request waiting to be retried doesn't
+        # hold a slot
+        async with (
+            self._get_semaphore(),
+            session.get(
+                self.base_url, params=params, auth=self.auth, timeout=_PAGE_TIMEOUT
+            ) as response,
+        ):
+            return orjson.loads(await response.read())
+
     async def _fetch_page_content(
         self, page_path: str, session: aiohttp.ClientSession
     ) -> str:
@@ -169,31 +350,80 @@ class WikiService:
         Returns:
             str: Content of the wiki page, or empty string if retrieval fails
         """
-        logger.debug(f"Fetching content for page: {page_path}")
+        logger.debug("Fetching content for page: %s", page_path)
         try:
-            params = {
-                "path": page_path,
-                "includeContent": "true",
-                "api-version": self.api_version,
-            }
-            async with session.get(self.base_url, params=params) as response:
-                if response.status == 200:
-                    page_data = await response.json()
-                    content = page_data.get("content", "")
-                    logger.debug(
-                        f"Fetched content for page: {page_path} ({len(content)} characters)"
-                    )
-                    return content
-                else:
-                    response_text = await response.text()
-                    logger.error(
-                        f"Failed to fetch content for page {page_path}. Status: {response.status}, Response: {response_text[:200]}"
-                    )
-                    return ""
+            page_data = await self._get_page(page_path, session)
+            content = page_data.get("content", "")
+            logger.debug(
+                "Fetched content for page: %s (%d characters)", page_path, len(content)
+            )
+            return content
+        except aiohttp.ClientResponseError as e:
+            logger.error(
+                f"Failed to fetch content for page {page_path}. Status: {e.status}, Reason: {e.message}"
+            )
+            return ""
         except Exception as e:
             logger.error(f"Error fetching content for page {page_path}: {str(e)}")
             return ""
 
+    async def _index_pages(
+        self, page_chunks: List[Tuple[str, List[Document]]]
+    ) -> Tuple[List[str], List[str]]:
+        """
+        Embed and store the chunks of several pages in one indexer call.
+
+        If the call is rejected as too large or malformed, the pages are
+        split in half and each half is indexed again, so a single bad page
+        fails alone rather than taking the whole wiki with it. Other errors,
+        such as throttling, fail the whole batch without further requests.
+        Chunks are stored under their content hash, so pages indexed again
+        after a partial write don't leave duplicates.
+
+        Args:
+            page_chunks: Path and chunks of each page to index
+
+        Returns:
+            Tuple[List[str], List[str]]: Paths of the indexed and of the failed pages
+        """
+        if not page_chunks:
+            return [], []
+
+        chunks = [chunk for _, page in page_chunks for chunk in page]
+        try:
+            # Only embed chunks whose text hasn't been indexed before, such
+            # as stub pages repeated across sections
+            new_chunks = await asyncio.to_thread(unseen_chunks, chunks, self.database)
+            await self.indexer.aadd_documents(
+                list(new_chunks.values()), ids=list(new_chunks)
+            )
+            await asyncio.to_thread(
+                self.database.add_chunk_hashes,
+                [
+                    (chunk_hash, chunk.metadata["source"], chunk_hash)
+                    for chunk_hash, chunk in new_chunks.items()
+                ],
+            )
+            logger.debug(
+                f"Indexed {len(new_chunks)} of {len(chunks)} chunks from {len(page_chunks)} wiki pages"
+            )
+            return [path for path, _ in page_chunks], []
+        except Exception as e:
+            if len(page_chunks) == 1 or not _is_payload_error(e):
+                logger.error(
+                    f"Error indexing {len(page_chunks)} wiki pages: {str(e)}",
+                    exc_info=True,
+                )
+                return [], [path for path, _ in page_chunks]
+            logger.warning(
+                f"Error indexing {len(page_chunks)} wiki pages, retrying in halves: {str(e)}"
+            )
+
+        middle = len(page_chunks) // 2
+        first_ok, first_failed = await self._index_pages(page_chunks[:middle])
+        second_ok, second_failed = await self._index_pages(page_chunks[middle:])
+        return first_ok + second_ok, first_failed + second_failed
+
     async def process_wiki(
         self,
         organization: str,
@@ -215,7 +445,7 @@ class WikiService:
 
         try:
             # Check if wiki has already been processed
-            if self.database.wiki_exists(organization, project, wiki_identifier):
+            if await self.database.awiki_exists(organization, project, wiki_identifier):
                 logger.debug(f"Wiki is already processed: {wiki_identifier}")
                 return {
                     "status": "Wiki already processed",
@@ -236,86 +466,164 @@ class WikiService:
                 logger.warning(f"No pages found in wiki: {wiki_identifier}")
                 return {"status": "No pages found"}
 
-            # Track processing results
-            processed_pages = []
-            failed_pages = []
-
-            total_pages = len(pages)
+            # Remove image tags once, dropping pages left without text before
+            # any task is scheduled for them. Pages whose text repeats an
+            # earlier page (templates, copied boilerplate) are indexed once,
+            # with the other paths recorded on the kept page's chunks.
+            page_contents = []
+            first_path_by_hash: Dict[str, str] = {}
+            duplicate_paths: Dict[str, List[str]] = {}
+            empty_pages = 0
+            for page in pages:
+                content = _MD_IMAGE_RE.sub("", page.content)
+                if not content.strip():
+                    empty_pages += 1
+                    continue
+                digest = hashlib.blake2b(content.encode(), digest_size=16).digest()
+                first_path = first_path_by_hash.setdefault(digest, page.page_path)
+                if first_path != page.page_path:
+                    duplicate_paths.setdefault(first_path, []).append(page.page_path)
+                    continue
+                page_contents.append((page, content))
+            if empty_pages:
+                logger.debug(f"Skipping {empty_pages} empty wiki pages")
+            duplicate_count = sum(map(len, duplicate_paths.values()))
+            if duplicate_count:
+                logger.debug(f"Skipping {duplicate_count} duplicate wiki pages")
+            del first_path_by_hash
+
+            total_pages = len(page_contents)
             logger.debug(f"Starting to process {total_pages} wiki pages")
 
+            # Metadata shared by every page of this wiki, built once
+            wiki_metadata = {
+                "organization": organization,
+                "project": project,
+                "wiki_identifier": wiki_identifier,
+            }
+
             # Define a function to process a single page
-            async def process_single_page(page: WikiPage, idx: int) -> None:
-                """Process a single wiki page."""
+            async def process_single_page(
+                page: WikiPage, content: str, idx: int
+            ) -> Optional[List[Document]]:
+                """
+                Split a single wiki page, with image tags removed, into chunks.
+
+                Returns the page's chunks, an empty list if the page was
+                skipped, or None if processing failed.
+                """
                 try:
+                    # Lazy %-formatting: built only when debug logging is on
                     logger.debug(
-                        f"Processing page {idx}/{total_pages}: {page.page_path}"
+                        "Processing page %d/%d: %s (%d characters)",
+                        idx,
+                        total_pages,
+                        page.page_path,
+                        len(content),
                     )
 
-                    # Skip empty pages
-                    if not page.content.strip():
-                        logger.warning(f"Page {page.page_path} is empty - skipping")
-                        return
-
-                    content_length = len(page.content)
-                    logger.debug(
-                        f"Page {page.page_path} content length: {content_length} characters"
-                    )
-
-                    # Remove image tags from wiki
-                    logger.debug("cleaning image tags.")
-                    content = re.sub(r"!\[[^\]]*\]\([^\)]*\)", "", page.content)
-
-                    if content == "":
-                        logger.warning(f"Page {page.page_path} is empty - skipping")
-                        return
-
                     # Create document with metadata
+                    metadata = {
+                        "source": f"wiki_{page.page_path}",
+                        **wiki_metadata,
+                        "remote_url": page.remote_url,
+                    }
+                    if page.page_path in duplicate_paths:
+                        # Vector store metadata values must be scalars
+                        metadata["duplicate_paths"] = "\n".join(
+                            duplicate_paths[page.page_path]
+                        )
                     doc = Document(
                         page_content=f"{page.page_path}\n{content}",
-                        metadata={
-                            "source": f"wiki_{page.page_path}",
-                            "organization": organization,
-                            "project": project,
-                            "wiki_identifier": wiki_identifier,
-                            "remote_url": page.remote_url,
-                        },
+                        metadata=metadata,
                     )
 
                     # Split document into chunks for vectorization
-                    chunks = self.indexer.text_splitter.split_documents([doc])
+                    chunks = await asyncio.to_thread(
+                        self.indexer.text_splitter.split_documents, [doc]
+                    )
 
                     if not chunks:
                         logger.warning(
                             f"No chunks generated for page {page.page_path} - skipping"
                         )
-                        return
-
-                    # Index the chunks
-                    if self.indexer.vector_store:
-                        self.indexer.vector_store.add_documents(chunks)
-                        processed_pages.append(page.page_path)
-                        logger.debug(
-                            f"Successfully processed and indexed page: {page.page_path} ({len(chunks)} chunks)"
-                        )
-                    else:
-                        logger.error("Vector store not initialized")
-                        failed_pages.append(page.page_path)
-                        logger.error(
-                            f"Failed to process page {page.page_path} due to uninitialized vector store"
-                        )
+                        return []
+
+                    logger.debug(
+                        "Successfully processed page: %s (%d chunks)",
+                        page.page_path,
+                        len(chunks),
+                    )
+                    return chunks
 
                 except Exception as e:
                     logger.error(
                         f"Error processing page {page.page_path}: {str(e)}",
                         exc_info=True,
                     )
-                    failed_pages.append(page.page_path)
-
-            # Process all pages concurrently
+                    return None
+
+            # Split pages are handed to a single indexing consumer, so
+            # embedding starts while later pages are still being split
+            queue: asyncio.Queue[Optional[Tuple[str, List[Document]]]] = asyncio.Queue()
+            # Chunks per indexing call: one full round of concurrent
+            # embedding requests
+            flush_size = settings.embedding_batch_size * settings.embedding_concurrency
+
+            async def produce(page: WikiPage, content: str, idx: int) -> bool:
+                """Split a page and queue its chunks; False if it failed."""
+                chunks = await process_single_page(page, content, idx)
+                if chunks:
+                    await queue.put((page.page_path, chunks))
+                return chunks is not None
+
+            async def consume() -> Tuple[List[str], List[str]]:
+                """Index queued pages in batches until the end marker."""
+                indexed: List[str] = []
+                failed: List[str] = []
+                batch: List[Tuple[str, List[Document]]] = []
+                batch_chunks = 0
+                while (item := await queue.get()) is not None:
+                    batch.append(item)
+                    batch_chunks += len(item[1])
+                    if batch_chunks >= flush_size:
+                        ok, bad = await self._index_pages(batch)
+                        indexed.extend(ok)
+                        failed.extend(bad)
+                        batch, batch_chunks = [], 0
+                ok, bad = await self._index_pages(batch)
+                return indexed + ok, failed + bad
+
+            # Process all pages concurrently, collecting outcomes afterwards
+            # rather than sharing result lists between the tasks
             tasks = [
-                process_single_page(page, idx) for idx, page in enumerate(pages, 1)
+                produce(page, content, idx)
+                for idx, (page, content) in enumerate(page_contents, 1)
             ]
-            await asyncio.gather(*tasks)
+            page_paths = [page.page_path for page, _ in page_contents]
+            # Each task now holds the only reference to its page's content,
+            # so the text is freed as soon as the page has been split rather
+            # than kept alive for the whole wiki
+            del pages, page_contents
+            consumer = asyncio.create_task(consume())
+            try:
+                results = await asyncio.gather(*tasks)
+                await queue.put(None)
+                processed_pages, index_failures = await consumer
+            finally:
+                # If a producer raised or the request was cancelled, the end
+                # marker never arrives; stop the consumer rather than leave
+                # it waiting on the queue forever
+                if not consumer.done():
+                    consumer.cancel()
+                    await asyncio.gather(consumer, return_exceptions=True)
+            failed_pages = [path for path, ok in zip(page_paths, results) if not ok]
+            failed_pages.extend(index_failures)
+            # A duplicate page shares the outcome of the page it repeats
+            for path in failed_pages[:]:
+                failed_pages.extend(duplicate_paths.get(path, ()))
+            for path in processed_pages[:]:
+                processed_pages.extend(duplicate_paths.get(path, ()))
 
             # Log processing summary
             logger.debug(
@@ -334,7 +642,7 @@ class WikiService:
                 }
             else:
                 # Record successful processing in database
-                self.database.add_wiki(organization, project, wiki_identifier)
+                await self.database.aupsert_wiki(organization, project, wiki_identifier)
                 return {
                     "status": "Successfully processed",
                     "processed_pages": len(processed_pages),